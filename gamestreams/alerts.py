@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from redbot.core import Config
+
+if TYPE_CHECKING:
+    from .utils import Stream
+
+
+class AlertFilters(NamedTuple):
+    """Which new streams of a game an alert announces."""
+
+    languages: FrozenSet[str] = frozenset()  # Language codes, empty allows any.
+    min_viewers: int = 0
+    tags: FrozenSet[str] = frozenset()  # Lowercased, a stream needs any of them.
+    mature: Optional[bool] = None  # Only mature or only not mature streams.
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> AlertFilters:
+        return cls(
+            languages=frozenset(data.get("languages", ())),
+            min_viewers=data.get("min_viewers", 0),
+            tags=frozenset(data.get("tags", ())),
+            mature=data.get("mature"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Only the filters that are set, so alerts without filters stay ``{}``."""
+        data: Dict[str, Any] = {}
+        if self.languages:
+            data["languages"] = sorted(self.languages)
+        if self.min_viewers:
+            data["min_viewers"] = self.min_viewers
+        if self.tags:
+            data["tags"] = sorted(self.tags)
+        if self.mature is not None:
+            data["mature"] = self.mature
+        return data
+
+    def describe(self) -> str:
+        parts: List[str] = []
+        if self.languages:
+            parts.append(f"languages: {', '.join(sorted(self.languages))}")
+        if self.min_viewers:
+            parts.append(f"at least {self.min_viewers} viewers")
+        if self.tags:
+            parts.append(f"tags: {', '.join(sorted(self.tags))}")
+        if self.mature is not None:
+            parts.append("mature only" if self.mature else "no mature streams")
+        return "; ".join(parts)
+
+    def matches(self, stream: Stream) -> bool:
+        if self.languages and stream.language_code not in self.languages:
+            return False
+        if stream.viewer_count < self.min_viewers:
+            return False
+        if self.mature is not None and stream.is_mature != self.mature:
+            return False
+        if self.tags and not any(tag.lower() in self.tags for tag in stream.tags or ()):
+            return False
+        return True
+
+
+NO_FILTERS = AlertFilters()
+
+
+class Alert(NamedTuple):
+    guild_id: int
+    channel_id: int
+    game_id: int
+    filters: AlertFilters = NO_FILTERS
+
+
+class AlertRegistry:
+    """Alerts of one platform, indexed by game and by guild.
+
+    Alerts are stored per guild under ``alerts -> platform -> game ID`` and every
+    change only writes the keys it touches, so toggling an alert costs the same no
+    matter how many alerts exist.
+    """
+
+    def __init__(self, config: Config, platform: str) -> None:
+        self.config = config
+        self.platform = platform
+
+        self.game_names: Dict[int, str] = {}
+        self.by_game: Dict[int, Dict[int, Alert]] = {}  # Game ID -> channel ID -> alert
+        self.by_guild: Dict[int, Dict[Tuple[int, int], Alert]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(alerts) for alerts in self.by_game.values())
+
+    async def load(self) -> None:
+        self.game_names.clear()
+        self.by_game.clear()
+        self.by_guild.clear()
+
+        for guild_id, guild_data in (await self.config.all_guilds()).items():
+            games = guild_data.get("alerts", {}).get(self.platform, {})
+            for game_id, game_data in games.items():
+                self.game_names[int(game_id)] = game_data["name"]
+                for channel_id, settings in game_data["channels"].items():
+                    self._index(
+                        Alert(
+                            guild_id,
+                            int(channel_id),
+                            int(game_id),
+                            AlertFilters.from_dict(settings),
+                        )
+                    )
+
+    def _index(self, alert: Alert) -> None:
+        self.by_game.setdefault(alert.game_id, {})[alert.channel_id] = alert
+        self.by_guild.setdefault(alert.guild_id, {})[
+            (alert.game_id, alert.channel_id)
+        ] = alert
+
+    def get(self, game_id: int, channel_id: int) -> Optional[Alert]:
+        return self.by_game.get(game_id, {}).get(channel_id)
+
+    def for_game(self, game_id: int) -> List[Alert]:
+        return list(self.by_game.get(game_id, {}).values())
+
+    def for_guild(self, guild_id: int) -> List[Alert]:
+        return list(self.by_guild.get(guild_id, {}).values())
+
+    def find_game(self, game_name: str) -> Optional[int]:
+        """Return the ID of the game alerts exist for under ``game_name``, if any."""
+        key = game_name.lower()
+        return next(
+            (
+                game_id
+                for game_id, name in self.game_names.items()
+                if name.lower() == key
+            ),
+            None,
+        )
+
+    def languages_for_game(self, game_id: int) -> Optional[FrozenSet[str]]:
+        """Return the languages any alert of a game wants, ``None`` if any goes."""
+        languages: FrozenSet[str] = frozenset()
+        for alert in self.by_game.get(game_id, {}).values():
+            if not alert.filters.languages:
+                return None
+            languages |= alert.filters.languages
+        return languages
+
+    async def add(self, alert: Alert, game_name: str) -> None:
+        group = self.config.guild_from_id(alert.guild_id).alerts
+        game_key = str(alert.game_id)
+
+        await group.set_raw(self.platform, game_key, "name", value=game_name)
+        await group.set_raw(
+            self.platform,
+            game_key,
+            "channels",
+            str(alert.channel_id),
+            value=alert.filters.to_dict(),
+        )
+
+        self.game_names[alert.game_id] = game_name
+        self._index(alert)
+
+    async def rename(self, game_id: int, game_name: str) -> None:
+        """Store the new name of a game, e.g. after it was renamed on the platform."""
+        for guild_id in {alert.guild_id for alert in self.for_game(game_id)}:
+            await self.config.guild_from_id(guild_id).alerts.set_raw(
+                self.platform, str(game_id), "name", value=game_name
+            )
+
+        self.game_names[game_id] = game_name
+
+    async def set_filters(self, alert: Alert, filters: AlertFilters) -> Alert:
+        group = self.config.guild_from_id(alert.guild_id).alerts
+        await group.set_raw(
+            self.platform,
+            str(alert.game_id),
+            "channels",
+            str(alert.channel_id),
+            value=filters.to_dict(),
+        )
+
+        alert = alert._replace(filters=filters)
+        self._index(alert)
+        return alert
+
+    async def remove(self, alert: Alert) -> None:
+        group = self.config.guild_from_id(alert.guild_id).alerts
+        game_key = str(alert.game_id)
+
+        game_alerts = self.by_game.get(alert.game_id, {})
+        game_alerts.pop(alert.channel_id, None)
+        guild_alerts = self.by_guild.get(alert.guild_id, {})
+        guild_alerts.pop((alert.game_id, alert.channel_id), None)
+
+        if any(key[0] == alert.game_id for key in guild_alerts):
+            await group.clear_raw(
+                self.platform, game_key, "channels", str(alert.channel_id)
+            )
+        else:
+            await group.clear_raw(self.platform, game_key)
+
+        if not game_alerts:
+            del self.by_game[alert.game_id]
+            self.game_names.pop(alert.game_id, None)
+        if not guild_alerts:
+            del self.by_guild[alert.guild_id]
+
+    async def remove_channel(self, guild_id: int, channel_id: int) -> None:
+        for alert in self.for_guild(guild_id):
+            if alert.channel_id == channel_id:
+                await self.remove(alert)
+
+    async def toggle(self, alert: Alert, game_name: str) -> bool:
+        """Add the alert if it does not exist or remove it, returns whether it was added."""
+        if self.get(alert.game_id, alert.channel_id) is not None:
+            await self.remove(alert)
+            return False
+
+        await self.add(alert, game_name)
+        return True
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+
+from redbot.core.bot import Red
+
+if TYPE_CHECKING:
+    from redbot.cogs.streams.streams import Streams
+
+# The Streams cog renews its bearer token once it expires in a minute or less.
+RENEW_BEFORE = 60
+# Used when the Streams cog did not record when its token expires.
+DEFAULT_TTL = 60 * 60
+# Keeps a token that failed to renew from being retried in a loop.
+MIN_REFRESH_DELAY = 30
+
+log = logging.getLogger("red.akaicogs.gamestreams.auth")
+
+
+class TwitchAuth:
+    """Twitch request headers built from the Streams cog's credentials.
+
+    The headers are cached until the bearer token is about to expire and renewed in
+    the background just before that, so callers rarely wait on a token request.
+    Concurrent callers share a single renewal. Headers that get a 401 are dropped
+    early, so a replaced or revoked token does not linger until it expires.
+    """
+
+    def __init__(self, bot: Red) -> None:
+        self.bot = bot
+        self._headers: Optional[Dict[str, str]] = None
+        self._expires_at = 0.0
+        self._renewal: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+
+    @property
+    def streams_cog(self) -> Optional[Streams]:
+        return self.bot.get_cog("Streams")  # type: ignore
+
+    def invalidate(self) -> None:
+        """Drop the cached headers, e.g. after the Twitch credentials changed."""
+        self._headers = None
+        self._expires_at = 0.0
+
+    def close(self) -> None:
+        for task in (self._renewal, self._refresher):
+            if task is not None:
+                task.cancel()
+
+    async def headers(self) -> Optional[Dict[str, str]]:
+        """Return the headers for Helix requests or ``None`` without credentials."""
+        if self.streams_cog is None:
+            return None
+
+        if self._headers is not None and time.time() < self._expires_at - RENEW_BEFORE:
+            return self._headers
+
+        return await self.renew()
+
+    async def renew(self) -> Optional[Dict[str, str]]:
+        if self._renewal is None or self._renewal.done():
+            self._renewal = asyncio.create_task(self._renew())
+
+        # Shielded so a cancelled caller does not cancel the renewal for the others.
+        return await asyncio.shield(self._renewal)
+
+    async def _renew(self) -> Optional[Dict[str, str]]:
+        streams_cog = self.streams_cog
+        if streams_cog is None:
+            return None
+
+        await streams_cog.maybe_renew_twitch_bearer_token()
+        client_id = (await self.bot.get_shared_api_tokens("twitch")).get("client_id")
+        access_token = streams_cog.ttv_bearer_cache.get("access_token")
+
+        if client_id is None or access_token is None:
+            self.invalidate()
+            return None
+
+        self._headers = {
+            "Client-ID": client_id,
+            "Authorization": f"Bearer {access_token}",
+        }
+        self._expires_at = streams_cog.ttv_bearer_cache.get(
+            "expires_at", time.time() + DEFAULT_TTL
+        )
+        self._schedule_refresh()
+        return self._headers
+
+    def _schedule_refresh(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+        self._refresher = asyncio.create_task(self._refresh(self._expires_at))
+
+    async def _refresh(self, expires_at: float) -> None:
+        delay = expires_at - RENEW_BEFORE - time.time()
+        await asyncio.sleep(max(MIN_REFRESH_DELAY, delay))
+
+        self._refresher = None
+        try:
+            await self.renew()
+        except Exception:
+            log.exception("Failed to renew the Twitch bearer token.")
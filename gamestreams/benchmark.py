@@ -0,0 +1,146 @@
+"""Benchmark GameStreams polling against the local mock Helix server.
+
+Run it from the repository root with Red installed::
+
+    python -m gamestreams.benchmark --games 500 --streams 200 --churn 0.05
+
+Every cycle advances a simulated clock by ``--tick`` seconds, churns the mock
+streams and runs one poll of the cog, the same stage ``check_streams`` runs before
+delivering announcements to Discord. Request counts, wall time and memory are
+reported per cycle, memory is the peak allocated on top of what was in use before
+the poll. The mock server runs in the same process, so its responses are included.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from redbot.core import data_manager
+
+from .alerts import Alert, AlertFilters
+from .listings import StreamListings
+from .mock import HEADERS, MockHelix
+
+
+async def run(args: argparse.Namespace) -> None:
+    # Config needs a data path, keep everything in a throwaway directory.
+    data_manager.basic_config = {
+        **data_manager.basic_config_default,
+        "DATA_PATH": tempfile.mkdtemp(prefix="gamestreams-benchmark-"),
+    }
+
+    # Imported late so that Config only ever sees the temporary data path.
+    from .gamestreams import GameStreams
+
+    mock = MockHelix(
+        games=args.games,
+        streams_per_game=args.streams,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+    cog = GameStreams(None)  # type: ignore # Delivery is not benchmarked.
+    poller = cog.twitch
+    poller.provider.url = await mock.start()  # type: ignore
+    # Cycles only advance the simulated clock, shared listings would never go stale.
+    poller.listings = StreamListings(poller.provider, ttl=0)
+    await poller.load()
+
+    filters = AlertFilters(
+        languages=frozenset(args.languages), min_viewers=args.min_viewers
+    )
+    for game_id, game in mock.games.items():
+        for i in range(args.alerts_per_game):
+            channel_id = game_id * 100 + i
+            await poller.alerts.add(
+                Alert(channel_id, channel_id, game_id, filters), game["name"]
+            )
+
+    print(
+        f"{args.games} games, {args.streams} streams per game, "
+        f"{args.alerts_per_game} alerts per game, {args.churn:.0%} churn per cycle"
+    )
+    print(
+        f"{'cycle':>5} {'requests':>9} {'429s':>5} {'games':>6} "
+        f"{'messages':>9} {'embeds':>7} {'seconds':>8} {'peak MiB':>9}"
+    )
+
+    now = time.time()
+    totals: List[float] = [0, 0]
+    tracemalloc.start()
+
+    try:
+        for cycle in range(args.cycles):
+            if cycle:
+                mock.churn(args.churn)
+
+            requests_before = sum(
+                mock.requests[endpoint] for endpoint in ("games", "streams")
+            )
+            rate_limited_before = mock.requests["429"]
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+            started = time.perf_counter()
+            announcements = await poller.poll_streams(
+                headers=HEADERS, period=args.tick, now=now
+            )
+            elapsed = time.perf_counter() - started
+
+            requests = (
+                sum(mock.requests[endpoint] for endpoint in ("games", "streams"))
+                - requests_before
+            )
+            polled = sum(
+                schedule.last_poll == now
+                for schedule in poller.scheduler.schedules.values()
+            )
+            embeds = sum(len(announcement.embeds) for announcement in announcements)
+            peak = (tracemalloc.get_traced_memory()[1] - baseline) / 2**20
+            totals[0] += requests
+            totals[1] += elapsed
+
+            print(
+                f"{cycle + 1:>5} {requests:>9} {mock.requests['429'] - rate_limited_before:>5} "
+                f"{polled:>6} {len(announcements):>9} {embeds:>7} {elapsed:>8.3f} {peak:>9.1f}"
+            )
+            now += args.tick
+    finally:
+        tracemalloc.stop()
+        await mock.close()
+
+    print(f"total: {int(totals[0])} requests in {totals[1]:.3f} seconds")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--streams", type=int, default=50, help="Streams per game.")
+    parser.add_argument("--alerts-per-game", type=int, default=1)
+    parser.add_argument(
+        "--languages", nargs="*", default=[], help="Language filter of every alert."
+    )
+    parser.add_argument(
+        "--min-viewers", type=int, default=0, help="Viewer filter of every alert."
+    )
+    parser.add_argument(
+        "--churn",
+        type=float,
+        default=0.05,
+        help="Fraction of streams replaced per cycle.",
+    )
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument(
+        "--tick", type=float, default=60, help="Simulated seconds between cycles."
+    )
+    parser.add_argument("--rate-limit", type=int, default=800)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import collections
+import time
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    NamedTuple,
+    Optional,
+    OrderedDict,
+    Tuple,
+)
+
+import discord
+from redbot.core.config import Group
+
+if TYPE_CHECKING:
+    from .utils import Stream
+
+GAME_TTL = 7 * 24 * 60 * 60  # Game names and box arts rarely change.
+MISSING_GAME_TTL = 60 * 60  # Misses are usually typos or not yet listed games.
+MAX_CACHED_GAMES = 1000
+MAX_CACHED_EMBEDS = 1000
+
+
+class CachedGame(NamedTuple):
+    data: Optional[dict]  # ``None`` means the game does not exist on the platform.
+    fetched_at: float
+
+
+class GameCache:
+    """Game lookups of one provider keyed by lowercased name, persisted in Config.
+
+    Entries are stored under ``group -> namespace``, usually the provider's name, so
+    every provider keeps its own names. Hits and misses expire after separate TTLs
+    and the least recently used entries are evicted once ``maxsize`` is reached.
+    Every change only writes its own key.
+    """
+
+    def __init__(
+        self,
+        group: Group,
+        namespace: str,
+        *,
+        maxsize: int = MAX_CACHED_GAMES,
+        ttl: float = GAME_TTL,
+        missing_ttl: float = MISSING_GAME_TTL,
+    ) -> None:
+        self.group = group
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self._entries: OrderedDict[str, CachedGame] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def load(self) -> None:
+        stored: Dict[str, dict] = await self.group.get_raw(self.namespace, default={})
+        entries = sorted(
+            (
+                (name, CachedGame(entry["data"], entry["fetched_at"]))
+                for name, entry in stored.items()
+            ),
+            key=lambda item: item[1].fetched_at,
+        )
+
+        self._entries.clear()
+        for name, entry in entries:
+            if not self._is_expired(entry):
+                self._entries[name] = entry
+
+        stale = stored.keys() - self._entries.keys()
+        for name in stale:
+            await self.group.clear_raw(self.namespace, name)
+        await self._evict()
+
+    def _is_expired(self, entry: CachedGame) -> bool:
+        ttl = self.ttl if entry.data is not None else self.missing_ttl
+        return time.time() - entry.fetched_at > ttl
+
+    def get(self, name: str) -> Tuple[bool, Optional[dict]]:
+        """Return whether ``name`` is cached and, if so, its game data."""
+        key = name.lower()
+        entry = self._entries.get(key)
+
+        if entry is None or self._is_expired(entry):
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, entry.data
+
+    async def set(self, name: str, data: Optional[dict]) -> None:
+        key = name.lower()
+        entry = CachedGame(data, time.time())
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        await self.group.set_raw(self.namespace, key, value=entry._asdict())
+        await self._evict()
+
+    async def _evict(self) -> None:
+        while len(self._entries) > self.maxsize:
+            name, _ = self._entries.popitem(last=False)
+            await self.group.clear_raw(self.namespace, name)
+
+
+class CachedEmbed(NamedTuple):
+    title: str
+    viewer_count: int
+    embed: discord.Embed
+
+
+class EmbedCache:
+    """Stream embeds keyed by stream ID, rebuilt once the title or viewer count changes.
+
+    Embeds are built with ``make_embed``, usually the provider's.
+
+    The returned embeds are shared, copy them before changing anything.
+    """
+
+    def __init__(
+        self,
+        make_embed: Callable[[Stream], discord.Embed],
+        *,
+        maxsize: int = MAX_CACHED_EMBEDS,
+    ) -> None:
+        self.make_embed = make_embed
+        self.maxsize = maxsize
+        self._entries: OrderedDict[int, CachedEmbed] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, stream: Stream) -> discord.Embed:
+        entry = self._entries.get(stream.id)
+
+        if (
+            entry is None
+            or entry.title != stream.title
+            or entry.viewer_count != stream.viewer_count
+        ):
+            entry = CachedEmbed(
+                stream.title, stream.viewer_count, self.make_embed(stream)
+            )
+            self._entries[stream.id] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        self._entries.move_to_end(stream.id)
+        return entry.embed
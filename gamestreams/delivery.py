@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import List, NamedTuple, Optional, Set
+
+import aiohttp
+import discord
+from redbot.core.bot import Red
+
+MAX_CONCURRENT_CHANNELS = 10
+MAX_EMBEDS_PER_MESSAGE = 10
+ANNOUNCEMENT_CONTENT = "Some new streams have started: "
+MAX_RETRIES = 3
+RETRY_DELAY = 2  # Doubled after every failed attempt.
+
+log = logging.getLogger("red.akaicogs.gamestreams.delivery")
+
+
+class Announcement(NamedTuple):
+    guild_id: int
+    channel_id: int
+    embeds: List[discord.Embed]
+    stream_ids: List[int]
+    # Report the sent messages, so they can be changed once their streams end.
+    tracked: bool = False
+
+
+class SentMessage(NamedTuple):
+    channel_id: int
+    message_id: int
+    # The stream of every embed of the message, ``None`` once it ended.
+    stream_ids: List[Optional[int]]
+    embeds: List[discord.Embed]
+
+
+class DeliveryReport(NamedTuple):
+    dead_channels: Set[int]
+    # The messages of tracked announcements.
+    messages: List[SentMessage]
+
+
+class _DeadChannel(Exception):
+    pass
+
+
+class AnnouncementDispatcher:
+    """Sends announcements to many channels at once.
+
+    Channels are served concurrently up to ``concurrency`` at a time while the
+    messages of one channel keep their order. Transient errors are retried with an
+    exponential backoff, channels that are gone or that the bot can no longer send
+    embeds in are reported back so their alerts can be dropped.
+    """
+
+    def __init__(self, bot: Red, *, concurrency: int = MAX_CONCURRENT_CHANNELS) -> None:
+        self.bot = bot
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def deliver(self, announcements: List[Announcement]) -> DeliveryReport:
+        """Send every announcement and report the dead channels and sent messages."""
+        report = DeliveryReport(set(), [])
+
+        await asyncio.gather(
+            *(
+                self._deliver_channel(announcement, report)
+                for announcement in announcements
+            )
+        )
+        return report
+
+    async def _deliver_channel(
+        self, announcement: Announcement, report: DeliveryReport
+    ) -> None:
+        guild = self.bot.get_guild(announcement.guild_id)
+        if guild is None:
+            report.dead_channels.add(announcement.channel_id)
+            return
+        if guild.unavailable:
+            return
+
+        channel = guild.get_channel(announcement.channel_id)
+        if not isinstance(channel, discord.TextChannel):
+            report.dead_channels.add(announcement.channel_id)
+            return
+
+        permissions = channel.permissions_for(guild.me)
+        if not (permissions.send_messages and permissions.embed_links):
+            report.dead_channels.add(announcement.channel_id)
+            return
+
+        async with self.semaphore:
+            try:
+                for start in range(0, len(announcement.embeds), MAX_EMBEDS_PER_MESSAGE):
+                    end = start + MAX_EMBEDS_PER_MESSAGE
+                    embeds = announcement.embeds[start:end]
+                    message = await self._send(channel, embeds)
+                    if message is not None and announcement.tracked:
+                        report.messages.append(
+                            SentMessage(
+                                channel.id,
+                                message.id,
+                                announcement.stream_ids[start:end],
+                                embeds,
+                            )
+                        )
+            except _DeadChannel:
+                report.dead_channels.add(announcement.channel_id)
+
+    async def _send(
+        self, channel: discord.TextChannel, embeds: List[discord.Embed]
+    ) -> Optional[discord.Message]:
+        """Send one message, raises ``_DeadChannel`` if the channel should be dropped."""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return await channel.send(content=ANNOUNCEMENT_CONTENT, embeds=embeds)
+            except (discord.NotFound, discord.Forbidden):
+                raise _DeadChannel
+            except discord.HTTPException as error:
+                if error.status < 500 and error.status != 429:
+                    log.error(f"Failed to announce streams in {channel.id}: {error}")
+                    return None
+                retry_error: Exception = error
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                retry_error = error
+
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(RETRY_DELAY * 2**attempt)
+
+        log.error(f"Giving up announcing streams in {channel.id}: {retry_error}")
+        return None
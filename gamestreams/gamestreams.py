@@ -24,44 +24,107 @@ SOFTWARE.
 
 from __future__ import annotations
 
-import datetime
+import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Literal, Optional, Sequence
 
-import aiohttp
 import discord
 from discord.ext import tasks
 from redbot.cogs.streams.streams import Streams
-from redbot.cogs.streams.streamtypes import TWITCH_BASE_URL
 from redbot.core import Config, commands
 from redbot.core.bot import Red
 from redbot.core.utils.views import SimpleMenu
 
-from .exceptions import FetchError, GameNotFoundError, StreamFetchError
-from .utils import Game, Stream
+from .alerts import Alert, AlertFilters
+from .exceptions import StreamFetchError
+from .poller import ProviderPoller
+from .providers import TwitchProvider
+from .utils import TWITCH_LANGUAGES
+from .views import StreamPager, StreamPageSource, StreamsMenu
 
-TWITCH_GAMES_ENDPOINT = TWITCH_BASE_URL + "/helix/games"
+log = logging.getLogger("red.akaicogs.gamestreams")
 
 
-log = logging.getLogger("red.akaicogs.gamestreams")
+class WordListConverter(commands.Converter):
+    async def convert(self, ctx: commands.Context, argument: str) -> Sequence[str]:
+        return [word.lower() for word in argument.split()]
+
+
+class LanguageListConverter(commands.Converter):
+    async def convert(self, ctx: commands.Context, argument: str) -> Sequence[str]:
+        languages = await WordListConverter().convert(ctx, argument)
+
+        for language in languages:
+            if language not in TWITCH_LANGUAGES and language != "other":
+                raise commands.BadArgument(
+                    f"`{language}` is not a Twitch language code, use codes such as `en` or `de`."
+                )
+
+        return languages
+
+
+class AlertFilterFlags(commands.FlagConverter, prefix="--", delimiter=" "):
+    channel: Optional[discord.TextChannel] = commands.flag(
+        description="Channel of the alert, defaults to the current channel.",
+        default=None,
+    )
+    languages: Sequence[str] = commands.flag(
+        description="Language codes of the streams to announce.",
+        converter=LanguageListConverter,
+        default=(),
+    )
+    min_viewers: int = commands.flag(
+        description="Viewers a stream needs before it gets announced.",
+        default=0,
+    )
+    tags: Sequence[str] = commands.flag(
+        description="Tags of which a stream needs at least one.",
+        converter=WordListConverter,
+        default=(),
+    )
+    mature: Optional[bool] = commands.flag(
+        description="Only announce mature streams if true, none if false.",
+        default=None,
+    )
 
 
 class GameStreams(commands.Cog):
     """Receive live announcements for new game streams."""
 
-    __version__ = "0.5.2"
+    __version__ = "0.12.12"
     __author__ = "Akai"
 
     def __init__(self, bot: Red) -> None:
         self.bot = bot
 
-        self.games: Dict[str, Optional[Game]] = {}
-
         self.config = Config.get_conf(self, identifier=7474034061)
-        self.config.register_global(alerts=[])
-
-        self.monitored_games: Dict[Game, List[Stream]] = {}
+        # The global alerts list is only kept to migrate it to per guild alerts and
+        # the flat games cache to drop it, game caches are kept per provider.
+        self.config.register_global(alerts=[], search_limit=25, games={}, game_cache={})
+        self.config.register_guild(alerts={}, end_action="keep")
+
+        self.legacy_alerts_migrated = False
+        # Guild ID -> what to do with announcements once their stream ends, only
+        # guilds that do not keep them are listed.
+        self.end_actions: Dict[int, str] = {}
+
+        self.twitch = ProviderPoller(
+            bot,
+            self.config,
+            TwitchProvider(bot),
+            end_actions=self.end_actions,
+        )
+        self.pollers: Dict[str, ProviderPoller] = {
+            poller.provider.name: poller for poller in (self.twitch,)
+        }
 
+    async def cog_load(self) -> None:
+        await self.config.games.clear()
+        for poller in self.pollers.values():
+            await poller.load()
+        for guild_id, guild_data in (await self.config.all_guilds()).items():
+            if guild_data["end_action"] != "keep":
+                self.end_actions[guild_id] = guild_data["end_action"]
         self.check_streams.start()
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
@@ -75,90 +138,47 @@ class GameStreams(commands.Cog):
 
     def cog_unload(self):
         self.check_streams.cancel()
+        for poller in self.pollers.values():
+            poller.close()
 
-    async def fetch_game_headers(self):
-        if not self.streams_cog:
-            return None
-
-        await self.streams_cog.maybe_renew_twitch_bearer_token()
-        token = (await self.bot.get_shared_api_tokens("twitch")).get("client_id")
-
-        if token is None:
-            return None
-
-        access_token = self.streams_cog.ttv_bearer_cache.get("access_token")
-
-        if access_token is None:
-            return None
-
-        headers = {
-            "Client-ID": token,
-            "Authorization": f"Bearer {access_token}",
-        }
-
-        return headers
+    @commands.Cog.listener()
+    async def on_red_api_tokens_update(
+        self, service_name: str, api_tokens: Dict[str, str]
+    ) -> None:
+        for poller in self.pollers.values():
+            poller.provider.on_api_tokens_update(service_name, api_tokens)
 
-    async def process_game_alert(
-        self, game_alert: dict, headers: dict
-    ) -> Optional[Tuple[List[Stream], List[dict]]]:
-        game_name = game_alert["game"]
-        game = await self.fetch_game(game_name, headers=headers)
-        alerts = game_alert["alerts"]
-        streams = await game.fetch_streams()
-
-        if game in self.monitored_games.keys():
-            new_streams = [
-                stream for stream in streams if not stream in self.monitored_games[game]
-            ]
-            self.monitored_games[game] = streams
-            return new_streams, alerts
-        else:
-            self.monitored_games[game] = streams
-            return [], alerts
+    async def fetch_game_headers(self) -> Optional[Dict[str, str]]:
+        return await self.twitch.provider.headers()
 
-    @tasks.loop(minutes=5)
+    @tasks.loop(minutes=1)
     async def check_streams(self):
-        if self.streams_cog is None:
-            return
-
         headers = await self.fetch_game_headers()
-        if headers is None:
-            return
-
-        game_alerts = await self.config.alerts()
-        self.last_checked = datetime.datetime.now(datetime.timezone.utc)
-        to_post_alerts: Dict[int, List[discord.Embed]] = {}
-
-        for game_alert in game_alerts:
-            new_game_alerts = await self.process_game_alert(game_alert, headers)
-            self.init = True
-
-            if new_game_alerts:
-                new_streams, alerts = new_game_alerts
-                log.debug(
-                    f"New streams for game {game_alert['game'].title()}: {', '.join(stream.title for stream in new_streams)}"
+        if headers is not None:
+            try:
+                await self.migrate_legacy_alerts(headers=headers)
+            except Exception as error:
+                # An error escaping the loop body would stop the loop for good, the
+                # migration is tried again on the next check instead.
+                log.error(
+                    "An error got raised while migrating legacy alerts: ",
+                    exc_info=error,
                 )
 
-                for stream in new_streams:
-                    embed = stream.make_embed()
-
-                    for alert in alerts:
-                        to_post_alerts.setdefault(alert["channel_id"], []).append(embed)
-
-        if to_post_alerts:
-            for channel_id, embeds in to_post_alerts.items():
-                channel = self.bot.get_channel(channel_id)
-                if channel is not None:
-                    for embeds_chunk in discord.utils.as_chunks(embeds, max_size=10):
-                        try:
-                            await channel.send(
-                                content="Some new streams have started: ",
-                                embeds=embeds_chunk,
-                            )  # type: ignore # Will always be discord.TextChannel
-                        # except discord.HTTPException:
-                        #     pass
-                        except Exception as error:
-                            log.error(error)
+        # Providers are polled side by side, a slow one does not delay the others.
+        results = await asyncio.gather(
+            *(
+                poller.check(period=self.check_streams.minutes * 60)
+                for poller in self.pollers.values()
+            ),
+            return_exceptions=True,
+        )
+        for poller, result in zip(self.pollers.values(), results):
+            if isinstance(result, Exception):
+                log.error(
+                    f"An error got raised while checking {poller.provider.name} streams: ",
+                    exc_info=result,
+                )
 
     @check_streams.before_loop
     async def check_streams_before_loop(self):
@@ -168,119 +188,99 @@ class GameStreams(commands.Cog):
     async def check_streams_error(self, error: BaseException) -> None:
         log.error("An error got raised while annoucing new streams: ", exc_info=error)
 
-    async def fetch_game(self, game_name: str, *, headers: dict) -> Game:
-        if game_name.lower() in self.games:
-            game = self.games[game_name.lower()]
-            if game is not None:
-                return game
-
-            raise GameNotFoundError("That game does not exist on Twitch.")
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                TWITCH_GAMES_ENDPOINT,
-                headers=headers,
-                params={"name": game_name, "first": 1},
-            ) as response:
-                if response.status == 401:
-                    raise FetchError(
-                        "Failed to fetch that game, make sure to set proper credentials. Check `[p]streamset twitchtoken` for more info."
-                    )
-
-                data = await response.json()
-                games_data = data["data"]
-                if not games_data:
-                    self.games[game_name.lower()] = None
-                    raise GameNotFoundError("That game does not exist on Twitch.")
-
-                game = Game(games_data[0], headers=headers)
-                self.games[game_name.lower()] = game
-                return game
+    async def migrate_legacy_alerts(self, *, headers: dict) -> None:
+        """Move alerts from the old global list, keyed by game name, to the guilds."""
+        if self.legacy_alerts_migrated:
+            return
 
-    @commands.group(name="gamestreams", aliases=["gs", "gamestream"])
-    @commands.guild_only()
-    async def gamestreams(self, ctx: commands.Context) -> None:
-        """Command to announce game streams and search them."""
+        legacy_alerts = await self.config.alerts()
+        if not legacy_alerts:
+            self.legacy_alerts_migrated = True
+            return
 
-    @gamestreams.group(name="twitch")
-    @commands.guild_only()
-    async def gamestreams_twitch(self, ctx: commands.Context) -> None:
-        """Command to announce game streams and search them on twitch."""
+        games = await self.twitch.fetch_games(
+            (game_alert["game"] for game_alert in legacy_alerts), headers=headers
+        )
 
-    @gamestreams_twitch.command(name="search", cooldown_after_parsing=True)
-    @commands.guild_only()
-    @commands.cooldown(rate=1, per=10, type=commands.BucketType.member)
-    async def gamestreams_twitch_search(
-        self, ctx: commands.GuildContext, *, game_name: str
-    ) -> None:
-        """Search ongoing streams for a game on Twitch."""
+        for game_alert in legacy_alerts:
+            game = games.get(game_alert["game"].lower())
+            if game is None:
+                log.warning(f"Dropping alerts for unknown game {game_alert['game']}.")
+                continue
+
+            for alert in game_alert["alerts"]:
+                await self.twitch.alerts.add(
+                    Alert(alert["guild_id"], alert["channel_id"], game.id), game.name
+                )
+
+        await self.config.alerts.clear()
+        self.legacy_alerts_migrated = True
+        log.info(
+            f"Migrated {len(self.twitch.alerts)} game alerts to per guild storage."
+        )
+
+    async def check_streams_cog(self, ctx: commands.Context) -> bool:
+        """Tell the user to load the Streams cog if it is not, Twitch needs it."""
         if self.streams_cog is None:
             await ctx.send(
                 f"Streams cog is currently not loaded. {' You can load the cog using `[p]load streams`' if await self.bot.is_owner(ctx.author) else ''}"
             )
-            return
+            return False
+        return True
 
-        headers = await self.fetch_game_headers()
+    async def fetch_provider_headers(
+        self, ctx: commands.Context, poller: ProviderPoller
+    ) -> Optional[Dict[str, str]]:
+        headers = await poller.provider.headers()
+        if headers is None:
+            await ctx.send(poller.provider.missing_credentials)
+        return headers
+
+    async def search_streams(
+        self, ctx: commands.GuildContext, poller: ProviderPoller, game_name: str
+    ) -> None:
+        headers = await self.fetch_provider_headers(ctx, poller)
         if headers is None:
-            await ctx.send(
-                "The Twitch Client ID is not set. Please read `;streamset twitchtoken`."
-            )
             return
 
         try:
-            game = await self.fetch_game(game_name, headers=headers)
+            game = await poller.fetch_game(game_name, headers=headers)
         except Exception as error:
             await ctx.send(str(error))
             return
 
+        search_limit = await self.config.search_limit()
+
         async with ctx.typing():
+            pager = StreamPager(game, listings=poller.listings, page_size=search_limit)
             try:
-                streams = await game.fetch_streams()
+                await pager.load(search_limit)
             except StreamFetchError as error:
                 await ctx.send(str(error))
                 return
 
-            if not streams:
+            if not pager.streams:
                 await ctx.send("No streams found for this game.")
                 return
 
-            embeds: List[discord.Embed] = []
-
-            for i, stream in enumerate(streams):
-                embed = stream.make_embed()
-                embed.set_footer(
-                    text=f"Page {i + 1}/{len(streams)}",
-                    icon_url=ctx.guild.icon or self.bot.user.display_avatar,  # type: ignore
-                )
-                embeds.append(embed)
-
-            pages = SimpleMenu(embeds, disable_after_timeout=True)  # type: ignore
+            source = StreamPageSource(
+                pager,
+                embeds=poller.embeds,
+                icon_url=ctx.guild.icon or self.bot.user.display_avatar,  # type: ignore
+            )
+            pages = StreamsMenu(source, disable_after_timeout=True)
 
             await pages.start(ctx)
 
-    @gamestreams_twitch.command(name="alert", cooldown_after_parsing=True)
-    @commands.guild_only()
-    @commands.has_permissions(manage_guild=True)
-    @commands.cooldown(rate=1, per=10, type=commands.BucketType.member)
-    async def gamestreams_twitch_alert(
+    async def toggle_alert(
         self,
         ctx: commands.GuildContext,
-        channel: Optional[discord.TextChannel] = None,
-        *,
+        poller: ProviderPoller,
+        channel: Optional[discord.TextChannel],
         game_name: str,
     ) -> None:
-        """Announce streams for a specific game."""
-        if self.streams_cog is None:
-            await ctx.send(
-                f"Streams cog is currently not loaded. {' You can load the cog using `[p]load streams`' if await self.bot.is_owner(ctx.author) else ''}"
-            )
-            return
-
-        headers = await self.fetch_game_headers()
+        headers = await self.fetch_provider_headers(ctx, poller)
         if headers is None:
-            await ctx.send(
-                "The Twitch Client ID is not set. Please read `;streamset twitchtoken`."
-            )
             return
 
         if channel is None:
@@ -289,88 +289,96 @@ class GameStreams(commands.Cog):
                 return
             channel = ctx.channel
 
-        try:
-            game = await self.fetch_game(game_name, headers=headers)
-        except Exception as error:
-            await ctx.send(str(error))
-            return
-
-        alerts = await self.config.alerts()
-
-        removed = False
-
-        for alert in alerts:
-            if alert["game"] == game.name.lower():
-                for game_alert in alert["alerts"]:
-                    if (
-                        game_alert["guild_id"] == ctx.guild.id
-                        and game_alert["channel_id"] == channel.id
-                    ):
-                        alert["alerts"].remove(game_alert)
-                        removed = True
-                        break
-                else:
-                    alert["alerts"].append(
-                        {
-                            "guild_id": ctx.guild.id,
-                            "channel_id": channel.id,
-                        }
-                    )
-                break
+        # Games alerts exist for are matched by their stored name first, which is
+        # kept up to date by polling, so their alerts can be removed without a lookup.
+        game_id = poller.alerts.find_game(game_name)
+        if game_id is not None:
+            game_name = poller.alerts.game_names[game_id]
         else:
-            alerts.append(
-                {
-                    "game": game.name.lower(),
-                    "alerts": [
-                        {
-                            "guild_id": ctx.guild.id,
-                            "channel_id": channel.id,
-                        }
-                    ],
-                }
-            )
+            try:
+                game = await poller.fetch_game(game_name, headers=headers)
+            except Exception as error:
+                await ctx.send(str(error))
+                return
+            game_id, game_name = game.id, game.name
 
-        await self.config.alerts.set(alerts)
+        added = await poller.alerts.toggle(
+            Alert(ctx.guild.id, channel.id, game_id), game_name
+        )
+        removed = not added
 
         message = (
-            f"Successfully {'removed' if removed else 'added'} alert for `{game.name}` "
+            f"Successfully {'removed' if removed else 'added'} alert for `{game_name}` "
             f"to {channel.mention}."
         )
         await ctx.reply(message, mention_author=False)
 
-    @gamestreams_twitch.command(name="alerts", cooldown_after_parsing=True)
-    @commands.guild_only()
-    @commands.is_owner()
-    @commands.cooldown(rate=1, per=5, type=commands.BucketType.member)
-    async def gamestreams_twitch_alerts(
+    async def set_alert_filters(
         self,
         ctx: commands.GuildContext,
+        poller: ProviderPoller,
+        game_name: str,
+        flags: AlertFilterFlags,
     ) -> None:
-        """Check all the streams that get announced."""
+        channel = flags.channel or ctx.channel
+        alert = next(
+            (
+                alert
+                for alert in poller.alerts.for_guild(ctx.guild.id)
+                if alert.channel_id == channel.id
+                and poller.alerts.game_names[alert.game_id].lower() == game_name.lower()
+            ),
+            None,
+        )
+        if alert is None:
+            await ctx.send(
+                f"There is no alert for `{game_name}` in {channel.mention}."  # type: ignore
+            )
+            return
+
+        filters = AlertFilters(
+            languages=frozenset(flags.languages),
+            min_viewers=max(flags.min_viewers, 0),
+            tags=frozenset(flags.tags),
+            mature=flags.mature,
+        )
+        await poller.alerts.set_filters(alert, filters)
 
-        alerts = await self.config.alerts()
+        game_name = poller.alerts.game_names[alert.game_id]
+        description = filters.describe()
+        if description:
+            await ctx.send(
+                f"Filters of the alert for `{game_name}` in {channel.mention}: {description}."  # type: ignore
+            )
+        else:
+            await ctx.send(
+                f"Cleared the filters of the alert for `{game_name}` in {channel.mention}."  # type: ignore
+            )
 
+    async def send_all_alerts(
+        self, ctx: commands.GuildContext, poller: ProviderPoller
+    ) -> None:
         embeds: List[discord.Embed] = []
+        total = len(poller.alerts.by_game)
 
-        for i, alert in enumerate(alerts):
-            game_name = alert["game"]
-            game_alerts = alert["alerts"]
+        for i, (game_id, game_alerts) in enumerate(poller.alerts.by_game.items()):
+            game_name = poller.alerts.game_names[game_id]
 
             description = ""
 
-            for j, game_alert in enumerate(game_alerts):
-                guild = ctx.bot.get_guild(game_alert["guild_id"])
-                channel = guild.get_channel(game_alert["channel_id"]) if guild else None
+            for j, game_alert in enumerate(game_alerts.values()):
+                guild = ctx.bot.get_guild(game_alert.guild_id)
+                channel = guild.get_channel(game_alert.channel_id) if guild else None
 
                 description += f"{j + 1}. {channel.mention if channel else 'Channel Not Found'} - {guild.name if guild else 'Guild Not Found'}\n"
 
             embed = discord.Embed(
-                title=game_name.title(),
+                title=game_name,
                 description=description,
                 colour=discord.Colour.random(),
             )
 
-            embed.set_footer(text=f"Page {i + 1}/{len(alerts)}")
+            embed.set_footer(text=f"Page {i + 1}/{total}")
 
             if description:
                 embeds.append(embed)
@@ -380,3 +388,143 @@ class GameStreams(commands.Cog):
             await pages.start(ctx)
         else:
             await ctx.send("No saved game alerts.")
+
+    async def send_guild_alerts(
+        self, ctx: commands.GuildContext, poller: ProviderPoller
+    ) -> None:
+        guild_alerts = poller.alerts.for_guild(ctx.guild.id)
+        if not guild_alerts:
+            await ctx.send("This server has no game alerts.")
+            return
+
+        lines = [
+            f"**{poller.alerts.game_names[alert.game_id]}** - <#{alert.channel_id}>"
+            + (f" ({alert.filters.describe()})" if alert.filters.describe() else "")
+            for alert in sorted(
+                guild_alerts,
+                key=lambda alert: poller.alerts.game_names[alert.game_id],
+            )
+        ]
+
+        embeds: List[discord.Embed] = []
+        chunks = list(discord.utils.as_chunks(lines, max_size=15))
+        for i, chunk in enumerate(chunks):
+            embed = discord.Embed(
+                title="Game Alerts",
+                description="\n".join(chunk),
+                colour=poller.provider.colour,
+            )
+            embed.set_footer(text=f"Page {i + 1}/{len(chunks)}")
+            embeds.append(embed)
+
+        pages = SimpleMenu(embeds, disable_after_timeout=True)  # type: ignore
+        await pages.start(ctx)
+
+    @commands.group(name="gamestreams", aliases=["gs", "gamestream"])
+    @commands.guild_only()
+    async def gamestreams(self, ctx: commands.Context) -> None:
+        """Command to announce game streams and search them."""
+
+    @gamestreams.group(name="twitch")
+    @commands.guild_only()
+    async def gamestreams_twitch(self, ctx: commands.Context) -> None:
+        """Command to announce game streams and search them on twitch."""
+
+    @gamestreams_twitch.command(name="search", cooldown_after_parsing=True)
+    @commands.guild_only()
+    @commands.cooldown(rate=1, per=10, type=commands.BucketType.member)
+    async def gamestreams_twitch_search(
+        self, ctx: commands.GuildContext, *, game_name: str
+    ) -> None:
+        """Search ongoing streams for a game on Twitch."""
+        if await self.check_streams_cog(ctx):
+            await self.search_streams(ctx, self.twitch, game_name)
+
+    @gamestreams_twitch.command(name="searchlimit")
+    @commands.is_owner()
+    async def gamestreams_twitch_searchlimit(
+        self, ctx: commands.Context, limit: commands.Range[int, 1, 100]
+    ) -> None:
+        """Set how many streams are loaded before a search is shown.
+
+        More streams are fetched on demand, as many at a time, when paging past the
+        loaded ones.
+        """
+        await self.config.search_limit.set(limit)
+        await ctx.send(f"Searches will now load {limit} streams upfront.")
+
+    @gamestreams_twitch.command(name="endaction")
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def gamestreams_twitch_endaction(
+        self, ctx: commands.GuildContext, action: Literal["keep", "edit", "delete"]
+    ) -> None:
+        """Set what happens to announcements once their stream ends.
+
+        `keep` leaves them as they are, `edit` replaces them with the stream's peak
+        viewer count and duration and `delete` removes them. Streams announced in the
+        same message are edited or removed one by one, the message is only deleted
+        once all of them ended.
+        """
+        if action == "keep":
+            await self.config.guild(ctx.guild).end_action.clear()
+            self.end_actions.pop(ctx.guild.id, None)
+        else:
+            await self.config.guild(ctx.guild).end_action.set(action)
+            self.end_actions[ctx.guild.id] = action
+
+        past_tense = {"keep": "kept", "edit": "edited", "delete": "deleted"}[action]
+        await ctx.send(f"Announcements of ended streams will now be {past_tense}.")
+
+    @gamestreams_twitch.command(name="alert", cooldown_after_parsing=True)
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    @commands.cooldown(rate=1, per=10, type=commands.BucketType.member)
+    async def gamestreams_twitch_alert(
+        self,
+        ctx: commands.GuildContext,
+        channel: Optional[discord.TextChannel] = None,
+        *,
+        game_name: str,
+    ) -> None:
+        """Announce streams for a specific game."""
+        if await self.check_streams_cog(ctx):
+            await self.toggle_alert(ctx, self.twitch, channel, game_name)
+
+    @gamestreams_twitch.command(name="filter")
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def gamestreams_twitch_filter(
+        self, ctx: commands.GuildContext, game_name: str, *, flags: AlertFilterFlags
+    ) -> None:
+        """Set which new streams an alert announces.
+
+        Quote game names with spaces. Passing no flags clears the alert's filters.
+
+        **Flags:**
+        `--channel`: Channel of the alert, defaults to the current channel.
+        `--languages`: Language codes of the streams to announce, such as `en de`.
+        `--min_viewers`: Viewers a stream needs before it gets announced.
+        `--tags`: Tags of which a stream needs at least one.
+        `--mature`: Only announce mature streams if true, none if false.
+        """
+        await self.set_alert_filters(ctx, self.twitch, game_name, flags)
+
+    @gamestreams_twitch.command(name="alerts", cooldown_after_parsing=True)
+    @commands.guild_only()
+    @commands.is_owner()
+    @commands.cooldown(rate=1, per=5, type=commands.BucketType.member)
+    async def gamestreams_twitch_alerts(
+        self,
+        ctx: commands.GuildContext,
+    ) -> None:
+        """Check all the streams that get announced."""
+        await self.send_all_alerts(ctx, self.twitch)
+
+    @gamestreams_twitch.command(name="list", cooldown_after_parsing=True)
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    @commands.cooldown(rate=1, per=5, type=commands.BucketType.member)
+    async def gamestreams_twitch_list(self, ctx: commands.GuildContext) -> None:
+        """List the game alerts of this server."""
+        await self.send_guild_alerts(ctx, self.twitch)
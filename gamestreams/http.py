@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Dict,
+    Mapping,
+    Optional,
+    Type,
+    Union,
+)
+
+import aiohttp
+from redbot.cogs.streams.streamtypes import TWITCH_BASE_URL
+
+from .exceptions import FetchError
+
+Params = Union[Mapping[str, Any], list]
+# Given headers that got a 401, returns fresh ones or ``None`` without credentials.
+Reauthorize = Callable[[Dict[str, str]], Awaitable[Optional[Dict[str, str]]]]
+
+HELIX_URL = TWITCH_BASE_URL + "/helix"
+
+
+class RateLimiter:
+    """A token bucket mirroring Twitch's per client ID rate limit.
+
+    Twitch refills ``Ratelimit-Limit`` points per minute and reports what is left in
+    ``Ratelimit-Remaining`` along with the time the bucket is full again in
+    ``Ratelimit-Reset``. Requests may run concurrently as long as there are tokens,
+    every response pulls the local bucket down to what Twitch reports and a 429
+    stops everyone until the reset.
+    """
+
+    _limiters: ClassVar[Dict[str, RateLimiter]] = {}
+
+    def __init__(self, limit: int = 800, period: float = 60) -> None:
+        self.limit = limit
+        self.period = period
+        self.tokens: float = limit
+        self.blocked_until: float = 0
+
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def for_client(cls, client_id: str) -> RateLimiter:
+        limiter = cls._limiters.get(client_id)
+        if limiter is None:
+            limiter = cls._limiters[client_id] = cls()
+        return limiter
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.limit, self.tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                wait_time = self.blocked_until - time.monotonic()
+                if wait_time <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep(max(wait_time, (1 - self.tokens) / self.rate))
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        limit = headers.get("Ratelimit-Limit")
+        if limit:
+            self.limit = int(limit)
+
+        remaining = headers.get("Ratelimit-Remaining")
+        if remaining:
+            self._refill()
+            self.tokens = min(self.tokens, int(remaining))
+
+    def block(self, headers: Mapping[str, str]) -> None:
+        """Stop all requests until the bucket resets, after a 429."""
+        reset = headers.get("Ratelimit-Reset")
+        # The reset is a unix timestamp, the bucket works on the monotonic clock.
+        wait_time = int(reset) - time.time() if reset else self.period / self.limit
+        self.tokens = 0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + wait_time + 0.1)
+
+
+async def helix_get(
+    endpoint: str,
+    *,
+    headers: dict,
+    params: Optional[Params] = None,
+    error: Type[FetchError] = FetchError,
+    url: Optional[str] = None,
+    reauthorize: Optional[Reauthorize] = None,
+) -> dict:
+    """Send a GET request to a Helix endpoint, such as ``"streams"``, through the rate
+    limiter of the request's client ID. ``url`` replaces the base URL of Helix.
+
+    After a 401 the request is retried once with the headers ``reauthorize`` returns,
+    if they differ, so a replaced token is picked up right away.
+    """
+    url = f"{url or HELIX_URL}/{endpoint}"
+    reauthorized = False
+
+    while True:
+        limiter = RateLimiter.for_client(headers["Client-ID"])
+        await limiter.acquire()
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, headers=headers, params=params) as response:
+                limiter.update(response.headers)
+
+                if response.status == 429:
+                    limiter.block(response.headers)
+                    # Retry the request once the bucket resets.
+                    continue
+
+                if response.status == 401:
+                    if reauthorize is not None and not reauthorized:
+                        reauthorized = True
+                        fresh_headers = await reauthorize(headers)
+                        if fresh_headers is not None and fresh_headers != headers:
+                            headers = fresh_headers
+                            continue
+
+                    raise error(
+                        "Failed to fetch from Twitch, make sure to set proper credentials. Check `[p]streamset twitchtoken` for more info."
+                    )
+
+                if response.status != 200:
+                    raise error(
+                        f"Error {response.status} was raised while fetching {endpoint}."
+                    )
+
+                return await response.json()
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Collection, Dict, List, Optional, Sequence
+
+from .utils import Game, Stream
+
+if TYPE_CHECKING:
+    from .providers import Provider
+
+LISTING_TTL = 30  # Long enough to absorb bursts of searches, short enough to look live.
+
+
+class StreamListing:
+    """The live streams of one game as far as they have been fetched."""
+
+    __slots__ = ("streams", "cursor", "exhausted", "fetched_at", "lock")
+
+    def __init__(self) -> None:
+        self.streams: List[Stream] = []
+        self.cursor: Optional[str] = None
+        self.exhausted = False
+        self.fetched_at = time.monotonic()
+        # Held while pages are fetched, so concurrent callers wait for them instead.
+        self.lock = asyncio.Lock()
+
+
+class StreamListings:
+    """Short lived stream listings keyed by game ID, shared by searches and polls.
+
+    Concurrent and near simultaneous requests for a game wait for the one fetch in
+    flight and reuse its result until it is ``ttl`` seconds old. Searches only page
+    as far as they need, polls fetch whole listings and can reuse a search that
+    already paged to the end, and the other way around.
+    """
+
+    def __init__(self, provider: Provider, *, ttl: float = LISTING_TTL) -> None:
+        self.provider = provider
+        self.ttl = ttl
+        self._listings: Dict[int, StreamListing] = {}
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def _prune(self) -> None:
+        deadline = time.monotonic() - self.ttl
+        for game_id in [
+            game_id
+            for game_id, listing in self._listings.items()
+            if listing.fetched_at < deadline and not listing.lock.locked()
+        ]:
+            del self._listings[game_id]
+
+    def _fresh(self, game_id: int) -> Optional[StreamListing]:
+        listing = self._listings.get(game_id)
+        if listing is None or time.monotonic() - listing.fetched_at > self.ttl:
+            return None
+        return listing
+
+    def get(self, game: Game) -> StreamListing:
+        """Return the game's fresh listing, or a new one that nothing was fetched for."""
+        self._prune()
+
+        listing = self._fresh(game.id)
+        if listing is None:
+            listing = self._listings[game.id] = StreamListing()
+        return listing
+
+    async def load(
+        self, game: Game, listing: StreamListing, count: int, *, page_size: int = 100
+    ) -> None:
+        """Page through ``listing`` until it holds ``count`` streams or is exhausted.
+
+        Pages hold up to ``page_size`` streams each.
+        """
+        async with listing.lock:
+            if len(listing.streams) >= count or listing.exhausted:
+                return
+
+            async for page, cursor in self.provider.iter_stream_pages(
+                game, headers=game.headers, cursor=listing.cursor, page_size=page_size
+            ):
+                listing.streams.extend(page)
+                listing.cursor = cursor
+                listing.exhausted = not page or listing.cursor is None
+                if len(listing.streams) >= count:
+                    break
+
+    async def fetch_many(
+        self,
+        games: Sequence[Game],
+        *,
+        headers: dict,
+        languages: Optional[Collection[str]] = None,
+    ) -> Dict[Game, List[Stream]]:
+        """Fetch the whole listings of many games, reusing fresh and in flight ones.
+
+        Fetches limited to ``languages`` can reuse whole listings but are not kept,
+        they only hold part of a game's streams.
+        """
+        self._prune()
+
+        streams: Dict[Game, List[Stream]] = {}
+        missing: List[Game] = []
+
+        for game in games:
+            listing = self._fresh(game.id)
+            if listing is not None and listing.lock.locked():
+                async with listing.lock:
+                    pass
+
+            if listing is not None and listing.exhausted:
+                streams[game] = (
+                    listing.streams
+                    if languages is None
+                    else [
+                        stream
+                        for stream in listing.streams
+                        if stream.language_code in languages
+                    ]
+                )
+            else:
+                missing.append(game)
+
+        if not missing:
+            return streams
+
+        if languages is not None:
+            streams.update(
+                await self.provider.fetch_streams(
+                    missing, headers=headers, languages=languages
+                )
+            )
+            return streams
+
+        listings = {game: StreamListing() for game in missing}
+        for game, listing in listings.items():
+            await listing.lock.acquire()  # New locks, this never waits.
+            self._listings[game.id] = listing
+
+        try:
+            fetched = await self.provider.fetch_streams(missing, headers=headers)
+            for game, game_streams in fetched.items():
+                listing = listings[game]
+                listing.streams = game_streams
+                listing.exhausted = True
+                listing.fetched_at = time.monotonic()
+                streams[game] = game_streams
+        finally:
+            for listing in listings.values():
+                listing.lock.release()
+
+        return streams
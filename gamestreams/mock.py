@@ -0,0 +1,211 @@
+"""A local fake of the Twitch Helix ``games`` and ``streams`` endpoints.
+
+It serves generated games and streams with cursor pagination, enforces a per client
+ID rate limit with ``Ratelimit-*`` headers and 429 responses and answers 401 to
+unknown bearer tokens, so GameStreams can be exercised without Twitch credentials.
+"""
+
+from __future__ import annotations
+
+import collections
+import itertools
+import random
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+CLIENT_ID = "mock-client-id"
+ACCESS_TOKEN = "mock-access-token"
+HEADERS = {"Client-ID": CLIENT_ID, "Authorization": f"Bearer {ACCESS_TOKEN}"}
+
+LANGUAGES = ("en", "en", "en", "es", "de", "fr", "pt", "ja", "ko", "ru")
+
+
+class MockHelix:
+    def __init__(
+        self,
+        *,
+        games: int = 100,
+        streams_per_game: int = 50,
+        rate_limit: int = 800,
+        rate_period: float = 60,
+        seed: int = 0,
+    ) -> None:
+        self.random = random.Random(seed)
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+
+        self.games: Dict[int, dict] = {}
+        self.games_by_name: Dict[str, dict] = {}
+        self.streams: Dict[int, Dict[int, dict]] = {}  # Game ID -> stream ID -> data
+        self._stream_ids = itertools.count(40_000_000_000)
+
+        for i in range(games):
+            self.add_game(f"Game {i}", streams=streams_per_game)
+
+        self.requests: collections.Counter[str] = collections.Counter()
+        self._buckets: Dict[str, List[float]] = {}  # Client ID -> [tokens, updated at]
+
+        self.app = web.Application()
+        self.app.router.add_get("/helix/games", self.get_games)
+        self.app.router.add_get("/helix/streams", self.get_streams)
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    async def start(self) -> str:
+        """Start serving on a free local port, returns the Helix base URL."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/helix"
+        return self.url
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def add_game(self, name: str, *, streams: int = 0) -> dict:
+        game_id = 10_000 + len(self.games)
+        data = {
+            "id": str(game_id),
+            "name": name,
+            "box_art_url": f"https://static-cdn.jtvnw.net/ttv-boxart/{game_id}-{{width}}x{{height}}.jpg",
+            "igdb_id": "",
+        }
+        self.games[game_id] = data
+        self.games_by_name[name.lower()] = data
+        self.streams[game_id] = {}
+
+        for _ in range(streams):
+            self.start_stream(game_id)
+        return data
+
+    def rename_game(self, game_id: int, name: str) -> None:
+        data = self.games[game_id]
+        del self.games_by_name[data["name"].lower()]
+        data["name"] = name
+        self.games_by_name[name.lower()] = data
+
+    def start_stream(self, game_id: int) -> dict:
+        stream_id = next(self._stream_ids)
+        data = {
+            "id": str(stream_id),
+            "user_id": str(stream_id % 1_000_000_000),
+            "user_login": f"streamer{stream_id}",
+            "user_name": f"Streamer{stream_id}",
+            "game_id": str(game_id),
+            "game_name": self.games[game_id]["name"],
+            "type": "live",
+            "title": f"Stream {stream_id}",
+            "tags": ["English"],
+            "viewer_count": int(self.random.paretovariate(1.2)) - 1,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "language": self.random.choice(LANGUAGES),
+            "thumbnail_url": f"https://static-cdn.jtvnw.net/previews-ttv/live_user_streamer{stream_id}-{{width}}x{{height}}.jpg",
+            "tag_ids": [],
+            "is_mature": self.random.random() < 0.1,
+        }
+        self.streams[game_id][stream_id] = data
+        return data
+
+    def churn(self, fraction: float) -> None:
+        """End ``fraction`` of every game's streams and start as many new ones."""
+        for game_id, streams in self.streams.items():
+            ended = self.random.sample(list(streams), round(len(streams) * fraction))
+            for stream_id in ended:
+                del streams[stream_id]
+                self.start_stream(game_id)
+
+            for stream in streams.values():
+                stream["viewer_count"] = max(
+                    0, stream["viewer_count"] + self.random.randint(-5, 5)
+                )
+
+    def _rate_limit_headers(self, client_id: str) -> Optional[Dict[str, str]]:
+        """Take a token from the client's bucket, returns ``None`` if it is empty."""
+        now = time.time()
+        bucket = self._buckets.setdefault(client_id, [self.rate_limit, now])
+        rate = self.rate_limit / self.rate_period
+        bucket[0] = min(self.rate_limit, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+
+        limited = bucket[0] < 1
+        if not limited:
+            bucket[0] -= 1
+
+        headers = {
+            "Ratelimit-Limit": str(self.rate_limit),
+            "Ratelimit-Remaining": str(int(bucket[0])),
+            "Ratelimit-Reset": str(int(now + (self.rate_limit - bucket[0]) / rate)),
+        }
+        return None if limited else headers
+
+    def _check(self, request: web.Request, endpoint: str) -> Dict[str, str]:
+        self.requests[endpoint] += 1
+
+        if request.headers.get("Authorization") != f"Bearer {ACCESS_TOKEN}":
+            self.requests["401"] += 1
+            raise web.HTTPUnauthorized(
+                text='{"error":"Unauthorized","status":401,"message":"Invalid OAuth token"}',
+                content_type="application/json",
+            )
+
+        client_id = request.headers.get("Client-ID", "")
+        headers = self._rate_limit_headers(client_id)
+        if headers is None:
+            self.requests["429"] += 1
+            now = time.time()
+            raise web.HTTPTooManyRequests(
+                headers={
+                    "Ratelimit-Limit": str(self.rate_limit),
+                    "Ratelimit-Remaining": "0",
+                    "Ratelimit-Reset": str(int(now) + 1),
+                },
+                text='{"error":"Too Many Requests","status":429,"message":""}',
+                content_type="application/json",
+            )
+        return headers
+
+    async def get_games(self, request: web.Request) -> web.Response:
+        headers = self._check(request, "games")
+
+        found = [
+            self.games_by_name.get(name.lower())
+            for name in request.query.getall("name", [])
+        ] + [self.games.get(int(game_id)) for game_id in request.query.getall("id", [])]
+
+        data = []
+        for game in found[:100]:
+            if game is not None and game not in data:
+                data.append(game)
+
+        return web.json_response({"data": data, "pagination": {}}, headers=headers)
+
+    async def get_streams(self, request: web.Request) -> web.Response:
+        headers = self._check(request, "streams")
+
+        game_ids = [int(game_id) for game_id in request.query.getall("game_id", [])]
+        languages = set(request.query.getall("language", []))
+        first = min(int(request.query.get("first", 20)), 100)
+        offset = int(request.query.get("after", 0))
+
+        streams = [
+            stream
+            for game_id in game_ids[:100]
+            for stream in self.streams.get(game_id, {}).values()
+            if not languages or stream["language"] in languages
+        ]
+        streams.sort(key=lambda stream: stream["viewer_count"], reverse=True)
+
+        page = streams[offset : offset + first]
+        pagination = {}
+        if offset + first < len(streams):
+            pagination["cursor"] = str(offset + first)
+
+        return web.json_response(
+            {"data": page, "pagination": pagination}, headers=headers
+        )
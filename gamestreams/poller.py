@@ -0,0 +1,442 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import discord
+from redbot.core import Config
+from redbot.core.bot import Red
+
+from .alerts import Alert, AlertRegistry
+from .cache import GAME_TTL, MISSING_GAME_TTL, CachedGame, EmbedCache, GameCache
+from .delivery import (
+    ANNOUNCEMENT_CONTENT,
+    Announcement,
+    AnnouncementDispatcher,
+    SentMessage,
+)
+from .exceptions import GameNotFoundError
+from .listings import StreamListings
+from .providers import Provider
+from .scheduler import PollScheduler
+from .state import AnnouncedStream, StreamStateStore
+from .utils import Game, Stream
+
+log = logging.getLogger("red.akaicogs.gamestreams.poller")
+
+
+class ProviderPoller:
+    """Alerts, polling and delivery for the games of one provider.
+
+    Every provider gets its own poller, so each one keeps its own schedule, request
+    budget and delivery concurrency and a slow platform never holds up another.
+    """
+
+    def __init__(
+        self,
+        bot: Red,
+        config: Config,
+        provider: Provider,
+        *,
+        end_actions: Dict[int, str],
+    ) -> None:
+        self.bot = bot
+        self.provider = provider
+        # Guild ID -> what to do with announcements once their stream ends, shared
+        # by every provider.
+        self.end_actions = end_actions
+
+        self.games = GameCache(config.game_cache, provider.name)
+        # Game ID -> data of the games alerts exist for, looked up by ID so a renamed
+        # game keeps being polled.
+        self.tracked_games: Dict[int, CachedGame] = {}
+        self.embeds = EmbedCache(provider.make_embed)
+        self.listings = StreamListings(provider)
+        self.alerts = AlertRegistry(config, provider.name)
+        self.dispatcher = AnnouncementDispatcher(bot, concurrency=provider.concurrency)
+        self.streams = StreamStateStore()
+        self.scheduler = PollScheduler()
+        # Game ID -> languages its streams were last fetched in, ``None`` for all.
+        self.game_languages: Dict[int, Optional[FrozenSet[str]]] = {}
+        # Stream ID -> streams announced in tracked messages that are still live.
+        self.announced_streams: Dict[int, AnnouncedStream] = {}
+        # (channel ID, message ID) -> tracked messages with streams that are live.
+        self.sent_messages: Dict[Tuple[int, int], SentMessage] = {}
+        # Ended streams whose announcements still have to be edited or deleted.
+        self.ended_streams: List[AnnouncedStream] = []
+        self.last_checked: Optional[datetime.datetime] = None
+
+    async def load(self) -> None:
+        await self.games.load()
+        await self.alerts.load()
+
+    def close(self) -> None:
+        self.provider.close()
+
+    async def check(self, *, period: float) -> None:
+        """Poll the games that are due and announce their new streams."""
+        headers = await self.provider.headers()
+        if headers is None:
+            return
+
+        announcements = await self.poll_streams(headers=headers, period=period)
+        if announcements:
+            await self.announce(announcements)
+        if self.ended_streams:
+            await self.close_ended_streams()
+
+    async def poll_streams(
+        self, *, headers: dict, period: float, now: Optional[float] = None
+    ) -> List[Announcement]:
+        """Poll the games that are due and build announcements for their new streams.
+
+        ``period`` is the time in seconds until the next poll, ``now`` is only passed
+        by the benchmark to simulate time.
+        """
+        self.last_checked = datetime.datetime.now(datetime.timezone.utc)
+        to_post_alerts: Dict[int, Announcement] = {}
+
+        limiter = self.provider.limiter(headers)
+        if limiter is not None:
+            self.scheduler.budget = limiter.limit * self.provider.poll_share
+
+        games = await self.fetch_tracked_games(headers=headers)
+        alerts_by_game: Dict[Game, List[Alert]] = {
+            game: self.alerts.for_game(game.id) for game in games
+        }
+
+        tracked_ids = {game.id for game in alerts_by_game}
+        for game_id in set(self.streams) - tracked_ids:
+            self._untrack(self.streams.forget(game_id))
+        for game_id in self.game_languages.keys() - tracked_ids:
+            del self.game_languages[game_id]
+
+        due_ids = set(self.scheduler.due(tracked_ids, period=period, now=now))
+        if not due_ids:
+            return []
+
+        # Helix filters by language itself, games wanting the same languages share
+        # their requests.
+        games_by_languages: Dict[Optional[FrozenSet[str]], List[Game]] = {}
+        for game in alerts_by_game:
+            if game.id not in due_ids:
+                continue
+
+            languages = self.alerts.languages_for_game(game.id)
+            if self.game_languages.get(game.id, languages) != languages:
+                # Streams outside the old languages would all look like new streams.
+                self._untrack(self.streams.forget(game.id))
+            self.game_languages[game.id] = languages
+            games_by_languages.setdefault(languages, []).append(game)
+
+        streams: Dict[Game, List[Stream]] = {}
+        for fetched in await asyncio.gather(
+            *(
+                self.listings.fetch_many(games, headers=headers, languages=languages)
+                for languages, games in games_by_languages.items()
+            )
+        ):
+            streams.update(fetched)
+
+        for game, game_streams in streams.items():
+            alerts = alerts_by_game[game]
+            delta = self.streams.apply(game.id, game_streams)
+            new_streams = delta.started
+            self.scheduler.update(
+                game.id,
+                streams=len(game_streams),
+                new_streams=len(new_streams),
+                now=now,
+            )
+
+            for stream_id, peak_viewers in delta.ended.items():
+                announced = self.announced_streams.pop(stream_id, None)
+                if announced is not None:
+                    announced.peak_viewers = peak_viewers
+                    self.ended_streams.append(announced)
+
+            if new_streams:
+                log.debug(
+                    f"New streams for game {game.name}: {', '.join(stream.title for stream in new_streams)}"
+                )
+
+            # Filters are checked before any embed is built.
+            for stream in new_streams:
+                self._add_announcements(
+                    to_post_alerts,
+                    game,
+                    stream,
+                    [alert for alert in alerts if alert.filters.matches(stream)],
+                )
+
+            # Streams that only now reached an alert's minimum viewer count.
+            for stream, previous_peak in delta.updated:
+                self._add_announcements(
+                    to_post_alerts,
+                    game,
+                    stream,
+                    [
+                        alert
+                        for alert in alerts
+                        if previous_peak
+                        < alert.filters.min_viewers
+                        <= stream.viewer_count
+                        and alert.filters.matches(stream)
+                    ],
+                )
+
+        return list(to_post_alerts.values())
+
+    def _add_announcements(
+        self,
+        to_post_alerts: Dict[int, Announcement],
+        game: Game,
+        stream: Stream,
+        alerts: List[Alert],
+    ) -> None:
+        if not alerts:
+            return
+
+        embed = self.embeds.get(stream)
+
+        for alert in alerts:
+            announcement = to_post_alerts.setdefault(
+                alert.channel_id,
+                Announcement(
+                    alert.guild_id,
+                    alert.channel_id,
+                    [],
+                    [],
+                    tracked=alert.guild_id in self.end_actions,
+                ),
+            )
+            announcement.embeds.append(embed)
+            announcement.stream_ids.append(stream.id)
+
+            # Only streams in tracked messages keep what their ended embed shows.
+            if announcement.tracked and stream.id not in self.announced_streams:
+                self.announced_streams[stream.id] = AnnouncedStream(stream)
+
+    async def announce(self, announcements: List[Announcement]) -> None:
+        report = await self.dispatcher.deliver(announcements)
+        guild_ids = {
+            announcement.channel_id: announcement.guild_id
+            for announcement in announcements
+        }
+
+        for sent in report.messages:
+            key = (sent.channel_id, sent.message_id)
+            for stream_id in sent.stream_ids:
+                announced = self.announced_streams.get(stream_id)  # type: ignore
+                if announced is not None:
+                    announced.messages.append(key)
+                    self.sent_messages[key] = sent
+        # Streams whose messages all failed to send have nothing to update.
+        for stream_id in [
+            stream_id
+            for stream_id, announced in self.announced_streams.items()
+            if not announced.messages
+        ]:
+            del self.announced_streams[stream_id]
+
+        for channel_id in report.dead_channels:
+            log.info(
+                f"Removing alerts for channel {channel_id}, it was deleted or "
+                "the bot can no longer send embeds there."
+            )
+            await self.alerts.remove_channel(guild_ids[channel_id], channel_id)
+
+    def _untrack(self, stream_ids: List[int]) -> None:
+        """Leave the announcements of streams that are no longer polled as they are."""
+        untracked: List[AnnouncedStream] = []
+        for stream_id in stream_ids:
+            announced = self.announced_streams.pop(stream_id, None)
+            if announced is not None:
+                untracked.append(announced)
+        untracked_ids = {announced.id for announced in untracked}
+        for announced in untracked:
+            for key in announced.messages:
+                sent = self.sent_messages.get(key)
+                if sent is None:
+                    continue
+
+                sent.stream_ids[:] = [
+                    None if stream_id in untracked_ids else stream_id
+                    for stream_id in sent.stream_ids
+                ]
+                if not any(stream_id is not None for stream_id in sent.stream_ids):
+                    del self.sent_messages[key]
+
+    async def close_ended_streams(self) -> None:
+        """Edit or delete the announcements of the streams that ended.
+
+        Announcements share their message with the other streams announced at the
+        same time, every message is changed once for all of its streams that ended.
+        """
+        ended_at = datetime.datetime.now(datetime.timezone.utc)
+        ended_streams, self.ended_streams = self.ended_streams, []
+
+        ended_by_message: Dict[Tuple[int, int], Dict[int, AnnouncedStream]] = {}
+        for announced in ended_streams:
+            for key in announced.messages:
+                ended_by_message.setdefault(key, {})[announced.id] = announced
+
+        for key, ended in ended_by_message.items():
+            sent = self.sent_messages.get(key)
+            if sent is None:
+                continue
+
+            channel = self.bot.get_channel(sent.channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                del self.sent_messages[key]
+                continue
+
+            end_action = self.end_actions.get(channel.guild.id, "keep")
+            if end_action == "delete":
+                kept = [
+                    (stream_id, embed)
+                    for stream_id, embed in zip(sent.stream_ids, sent.embeds)
+                    if stream_id not in ended
+                ]
+                sent.stream_ids[:] = [stream_id for stream_id, _ in kept]
+                sent.embeds[:] = [embed for _, embed in kept]
+            else:
+                for index, stream_id in enumerate(sent.stream_ids):
+                    announced = ended.get(stream_id)  # type: ignore
+                    if announced is None:
+                        continue
+
+                    sent.stream_ids[index] = None
+                    if end_action == "edit":
+                        sent.embeds[index] = self.provider.make_ended_embed(
+                            announced, ended_at
+                        )
+
+            live = any(stream_id is not None for stream_id in sent.stream_ids)
+            if not live:
+                del self.sent_messages[key]
+            if end_action == "keep":
+                continue
+
+            message = channel.get_partial_message(sent.message_id)
+            try:
+                if sent.embeds:
+                    await message.edit(
+                        content=ANNOUNCEMENT_CONTENT if live else None,
+                        embeds=sent.embeds,
+                    )
+                else:
+                    await message.delete()
+            except discord.HTTPException:
+                pass
+
+    async def fetch_tracked_games(self, *, headers: dict) -> List[Game]:
+        """Return the games alerts exist for, resolved by their ID.
+
+        Their data is refreshed in batches of the provider's ``max_batch`` once it is
+        older than ``GAME_TTL``, picking up new names and box arts. Games that no
+        longer exist are skipped and looked up again after ``MISSING_GAME_TTL``.
+        """
+        now = time.time()
+        for game_id in self.tracked_games.keys() - self.alerts.game_names.keys():
+            del self.tracked_games[game_id]
+
+        stale: List[int] = []
+        for game_id in self.alerts.game_names:
+            entry = self.tracked_games.get(game_id)
+            if entry is None:
+                stale.append(game_id)
+                continue
+
+            ttl = GAME_TTL if entry.data is not None else MISSING_GAME_TTL
+            if now - entry.fetched_at > ttl:
+                stale.append(game_id)
+
+        for ids_chunk in discord.utils.as_chunks(stale, self.provider.max_batch):
+            games_data = await self.provider.request_games_by_id(
+                ids_chunk, headers=headers
+            )
+            found: Dict[int, Tuple[dict, Game]] = {}
+            for data in games_data:
+                game = self.provider.make_game(data, headers=headers)
+                found[game.id] = (data, game)
+
+            for game_id in ids_chunk:
+                game_name = self.alerts.game_names[game_id]
+                if game_id not in found:
+                    self.tracked_games[game_id] = CachedGame(None, now)
+                    log.warning(f"Skipping alerts for unknown game {game_name}.")
+                    continue
+
+                data, game = found[game_id]
+                self.tracked_games[game_id] = CachedGame(data, now)
+                if game.name != game_name:
+                    await self.alerts.rename(game_id, game.name)
+
+        return [
+            self.provider.make_game(entry.data, headers=headers)
+            for entry in self.tracked_games.values()
+            if entry.data is not None
+        ]
+
+    async def fetch_game(self, game_name: str, *, headers: dict) -> Game:
+        game = (await self.fetch_games([game_name], headers=headers))[game_name.lower()]
+        if game is None:
+            raise GameNotFoundError(
+                f"That game does not exist on {self.provider.display_name}."
+            )
+
+        return game
+
+    async def fetch_games(
+        self, game_names: Iterable[str], *, headers: dict
+    ) -> Dict[str, Optional[Game]]:
+        """Resolve many game names at once, keyed by lowercased name.
+
+        Names missing from the cache are looked up in batches of the provider's
+        ``max_batch``. Unknown games map to ``None``.
+        """
+        games: Dict[str, Optional[Game]] = {}
+        missing: List[str] = []
+
+        for game_name in game_names:
+            key = game_name.lower()
+            if key in games or key in missing:
+                continue
+
+            cached, data = self.games.get(key)
+            if cached:
+                games[key] = (
+                    self.provider.make_game(data, headers=headers)
+                    if data is not None
+                    else None
+                )
+            else:
+                missing.append(key)
+
+        for names_chunk in discord.utils.as_chunks(missing, self.provider.max_batch):
+            games_data = await self.provider.request_games(names_chunk, headers=headers)
+            by_name = {data["name"].lower(): data for data in games_data}
+
+            # Lookups match names loosely, a lone leftover result belongs to the
+            # lone leftover name.
+            unmatched = [name for name in names_chunk if name not in by_name]
+            leftovers = [
+                data for name, data in by_name.items() if name not in names_chunk
+            ]
+            if len(unmatched) == 1 and len(leftovers) == 1:
+                by_name[unmatched[0]] = leftovers[0]
+
+            for name in names_chunk:
+                data = by_name.get(name)
+                await self.games.set(name, data)
+                games[name] = (
+                    self.provider.make_game(data, headers=headers)
+                    if data is not None
+                    else None
+                )
+
+        return games
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import abc
+import datetime
+from typing import (
+    AsyncIterator,
+    ClassVar,
+    Collection,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import discord
+from redbot.cogs.streams.streamtypes import rnd
+from redbot.core.bot import Red
+from redbot.core.utils.chat_formatting import humanize_timedelta
+
+from .auth import TwitchAuth
+from .delivery import MAX_CONCURRENT_CHANNELS
+from .http import RateLimiter, helix_get
+from .state import AnnouncedStream
+from .utils import (
+    Game,
+    Stream,
+    fetch_stream_data_page,
+    fetch_stream_data_for_games,
+    parse_timestamp,
+)
+
+
+class Provider(abc.ABC):
+    """A streaming platform that game streams are fetched from.
+
+    A provider only talks to its platform, it looks up games by name in batches,
+    pages through the live streams of games and paces its requests. It also knows
+    how its streams are linked to and shown. Alerts, polling and delivery are built
+    on top of it and run separately for every provider.
+    """
+
+    # Key of the provider's alerts in guild config.
+    name: ClassVar[str]
+    # Name of the platform shown to users.
+    display_name: ClassVar[str]
+    # Sent instead of running a command while ``headers`` returns ``None``.
+    missing_credentials: ClassVar[str]
+    # Colour of the embeds of live streams.
+    colour: ClassVar[discord.Colour] = discord.Colour.blurple()
+    # Most game names or IDs a single lookup or streams request accepts.
+    max_batch: ClassVar[int] = 100
+    # Share of the rate limit polling may use, the rest is left to searches.
+    poll_share: ClassVar[float] = 0.5
+    # Channels its announcements are sent to at once.
+    concurrency: ClassVar[int] = MAX_CONCURRENT_CHANNELS
+
+    def close(self) -> None:
+        """Stop any background work of the provider."""
+
+    def on_api_tokens_update(
+        self, service_name: str, api_tokens: Dict[str, str]
+    ) -> None:
+        """Called whenever the API tokens of any service are changed."""
+
+    @abc.abstractmethod
+    def stream_url(self, stream: Union[Stream, AnnouncedStream]) -> str:
+        """Return the link to a stream's channel."""
+
+    def stream_image(self, stream: Stream) -> str:
+        """Return the image a live stream's embed shows."""
+        return stream.image
+
+    def make_embed(self, stream: Stream) -> discord.Embed:
+        """Build the embed a live stream is announced and searched with."""
+        embed = discord.Embed(
+            title=stream.title,
+            description=f"**{stream.user_name}** is streaming **{stream.game_name}**",
+            url=self.stream_url(stream),
+            color=self.colour,
+        )
+
+        embed.set_image(url=self.stream_image(stream))
+        embed.set_thumbnail(url=stream.game.image)
+
+        embed.add_field(
+            name="Viewer Count",
+            value=f"{stream.viewer_count} viewers",
+            inline=False,
+        )
+        embed.add_field(name="Language", value=stream.language, inline=False)
+        embed.add_field(
+            name="Started",
+            value=f"{discord.utils.format_dt(stream.started_at, style='R')} ({discord.utils.format_dt(stream.started_at)})",
+            inline=False,
+        )
+        embed.add_field(
+            name="Is Adult Stream?",
+            value="Yes" if stream.is_mature else "No",
+            inline=False,
+        )
+        if stream.tags:
+            embed.add_field(name="Tags", value=", ".join(stream.tags), inline=False)
+        return embed
+
+    def make_ended_embed(
+        self, stream: AnnouncedStream, ended_at: datetime.datetime
+    ) -> discord.Embed:
+        """Build the embed an announcement is edited to once its stream ended."""
+        embed = discord.Embed(
+            title=stream.title,
+            description=f"**{stream.user_name}** was streaming **{stream.game_name}**",
+            url=self.stream_url(stream),
+            color=discord.Color.dark_grey(),
+        )
+        embed.add_field(
+            name="Peak Viewer Count",
+            value=f"{stream.peak_viewers} viewers",
+            inline=False,
+        )
+        started_at = parse_timestamp(stream.started_at)
+        embed.add_field(
+            name="Streamed",
+            value=f"{humanize_timedelta(timedelta=ended_at - started_at) or 'Less than a second'}"
+            f" (started {discord.utils.format_dt(started_at)})",
+            inline=False,
+        )
+        embed.set_footer(text="This stream has ended.")
+        return embed
+
+    @abc.abstractmethod
+    async def headers(self) -> Optional[Dict[str, str]]:
+        """Return the headers for requests or ``None`` if credentials are missing."""
+
+    def limiter(self, headers: Dict[str, str]) -> Optional[RateLimiter]:
+        """Return the rate limiter requests with ``headers`` go through, if any."""
+        return None
+
+    @abc.abstractmethod
+    async def request_games(
+        self, game_names: List[str], *, headers: Dict[str, str]
+    ) -> List[dict]:
+        """Look up to ``max_batch`` games by name, returns the data of those found."""
+
+    @abc.abstractmethod
+    async def request_games_by_id(
+        self, game_ids: List[int], *, headers: Dict[str, str]
+    ) -> List[dict]:
+        """Look up to ``max_batch`` games by ID, returns the data of those found."""
+
+    @abc.abstractmethod
+    def make_game(self, data: dict, *, headers: Dict[str, str]) -> Game:
+        """Build a game from the data returned by either game lookup."""
+
+    @abc.abstractmethod
+    async def fetch_stream_page(
+        self,
+        game: Game,
+        *,
+        headers: Dict[str, str],
+        cursor: Optional[str] = None,
+        page_size: int = 100,
+    ) -> Tuple[List[Stream], Optional[str]]:
+        """Fetch one page of a game's live streams and the cursor of the next one.
+
+        ``page_size`` is the most streams the page holds.
+        """
+
+    async def iter_stream_pages(
+        self,
+        game: Game,
+        *,
+        headers: Dict[str, str],
+        cursor: Optional[str] = None,
+        page_size: int = 100,
+    ) -> AsyncIterator[Tuple[List[Stream], Optional[str]]]:
+        """Page through a game's live streams, yielding every page and its next cursor.
+
+        Pages are only fetched while the caller keeps iterating, so callers that
+        stop early, e.g. once they have enough streams, never fetch the rest.
+        """
+        while True:
+            page, cursor = await self.fetch_stream_page(
+                game, headers=headers, cursor=cursor, page_size=page_size
+            )
+            yield page, cursor
+
+            if not page or cursor is None:
+                return
+
+    @abc.abstractmethod
+    async def fetch_streams(
+        self,
+        games: Sequence[Game],
+        *,
+        headers: Dict[str, str],
+        languages: Optional[Collection[str]] = None,
+    ) -> Dict[Game, List[Stream]]:
+        """Fetch every live stream of many games, sorted by viewer count.
+
+        ``languages`` limits the streams to those languages, providers that cannot
+        filter by language in the request filter the results instead.
+        """
+
+
+class TwitchProvider(Provider):
+    """Twitch through the Helix API, using the credentials of the Streams cog."""
+
+    name = "twitch"
+    display_name = "Twitch"
+    missing_credentials = (
+        "The Twitch Client ID is not set. Please read `;streamset twitchtoken`."
+    )
+    colour = discord.Colour.purple()
+
+    def __init__(self, bot: Red, *, url: Optional[str] = None) -> None:
+        self.auth = TwitchAuth(bot)
+        # Base URL of Helix, only set to point the provider at a fake server.
+        self.url = url
+
+    def close(self) -> None:
+        self.auth.close()
+
+    def on_api_tokens_update(
+        self, service_name: str, api_tokens: Dict[str, str]
+    ) -> None:
+        if service_name == "twitch":
+            self.auth.invalidate()
+
+    def stream_url(self, stream: Union[Stream, AnnouncedStream]) -> str:
+        return f"https://twitch.tv/{stream.user_login}"
+
+    def stream_image(self, stream: Stream) -> str:
+        # Discord caches images by URL, the random query string makes it show the
+        # current preview.
+        return rnd(stream.image)
+
+    async def headers(self) -> Optional[Dict[str, str]]:
+        return await self.auth.headers()
+
+    async def reauthorize(self, headers: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Return fresh headers after ``headers`` got a 401.
+
+        The cached headers are only dropped if they are the ones that failed, the
+        requests still holding older ones pick up the renewed headers as they are.
+        """
+        fresh_headers = await self.auth.headers()
+        if fresh_headers == headers:
+            self.auth.invalidate()
+            fresh_headers = await self.auth.headers()
+        return fresh_headers
+
+    def limiter(self, headers: Dict[str, str]) -> Optional[RateLimiter]:
+        return RateLimiter.for_client(headers["Client-ID"])
+
+    async def request_games(
+        self, game_names: List[str], *, headers: Dict[str, str]
+    ) -> List[dict]:
+        data = await helix_get(
+            "games",
+            headers=headers,
+            params=[("name", game_name) for game_name in game_names],
+            url=self.url,
+            reauthorize=self.reauthorize,
+        )
+        return data["data"]
+
+    async def request_games_by_id(
+        self, game_ids: List[int], *, headers: Dict[str, str]
+    ) -> List[dict]:
+        data = await helix_get(
+            "games",
+            headers=headers,
+            params=[("id", game_id) for game_id in game_ids],
+            url=self.url,
+            reauthorize=self.reauthorize,
+        )
+        return data["data"]
+
+    def make_game(self, data: dict, *, headers: Dict[str, str]) -> Game:
+        return Game(
+            id=int(data["id"]),
+            name=data["name"],
+            image=data["box_art_url"].format(width=180, height=180),
+            headers=headers,
+        )
+
+    @staticmethod
+    def make_stream(game: Game, data: dict) -> Stream:
+        """Build a stream from its data in a Helix streams page."""
+        return Stream(
+            game,
+            id=int(data["id"]),
+            title=data["title"],
+            user_name=data["user_name"],
+            user_login=data["user_login"],
+            game_name=data["game_name"],
+            viewer_count=data["viewer_count"],
+            is_mature=data["is_mature"],
+            tags=data["tags"],
+            thumbnail_url=data["thumbnail_url"],
+            language=data["language"],
+            started_at=data["started_at"],
+        )
+
+    async def fetch_stream_page(
+        self,
+        game: Game,
+        *,
+        headers: Dict[str, str],
+        cursor: Optional[str] = None,
+        page_size: int = 100,
+    ) -> Tuple[List[Stream], Optional[str]]:
+        page, cursor = await fetch_stream_data_page(
+            [("game_id", game.id)],
+            headers=headers,
+            first=page_size,
+            cursor=cursor,
+            url=self.url,
+            reauthorize=self.reauthorize,
+        )
+        return [self.make_stream(game, data) for data in page], cursor
+
+    async def fetch_streams(
+        self,
+        games: Sequence[Game],
+        *,
+        headers: Dict[str, str],
+        languages: Optional[Collection[str]] = None,
+    ) -> Dict[Game, List[Stream]]:
+        stream_data = await fetch_stream_data_for_games(
+            games,
+            headers=headers,
+            url=self.url,
+            languages=languages,
+            reauthorize=self.reauthorize,
+        )
+        return {
+            game: [self.make_stream(game, data) for data in game_stream_data]
+            for game, game_stream_data in stream_data.items()
+        }
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List, Optional
+
+MIN_INTERVAL = 60
+MAX_INTERVAL = 15 * 60
+DEFAULT_INTERVAL = 5 * 60
+
+# Polls are spaced so that roughly this many new streams show up between two polls.
+TARGET_NEW_STREAMS = 1
+# Weight of the latest poll in the moving average of new streams per second.
+SMOOTHING = 0.3
+# Helix requests per minute the poller may use, Twitch allows 800 per client ID.
+REQUEST_BUDGET = 400
+
+
+class GameSchedule:
+    __slots__ = ("interval", "next_poll", "last_poll", "rate", "streams")
+
+    def __init__(self, now: float) -> None:
+        self.interval: float = DEFAULT_INTERVAL
+        self.next_poll: float = now
+        self.last_poll: Optional[float] = None
+        self.rate: float = 0  # New streams per second.
+        self.streams: int = 0
+
+    @property
+    def cost(self) -> float:
+        # Streams of 100 games share a listing, so a game costs its share of pages.
+        return (self.streams + 1) / 100
+
+
+class PollScheduler:
+    """Gives every game its own polling interval.
+
+    Games where new streams show up often are polled as often as every minute, quiet
+    games back off to every 15 minutes. Every tick only picks due games until the
+    estimated request cost reaches the budget, games left over stay due and are
+    picked first on the next tick.
+    """
+
+    def __init__(self, *, budget: float = REQUEST_BUDGET) -> None:
+        self.budget = budget
+        self.schedules: Dict[int, GameSchedule] = {}
+
+    def due(
+        self,
+        game_ids: Iterable[int],
+        *,
+        period: float = 60,
+        now: Optional[float] = None,
+    ) -> List[int]:
+        """Return the games to poll this tick, ``period`` is the tick length in seconds."""
+        now = time.time() if now is None else now
+        game_ids = set(game_ids)
+
+        for game_id in self.schedules.keys() - game_ids:
+            del self.schedules[game_id]
+        for game_id in game_ids - self.schedules.keys():
+            self.schedules[game_id] = GameSchedule(now)
+
+        due = sorted(
+            (
+                (schedule.next_poll, game_id)
+                for game_id, schedule in self.schedules.items()
+                if schedule.next_poll <= now
+            ),
+        )
+
+        budget = self.budget * period / 60
+        selected: List[int] = []
+        for _, game_id in due:
+            budget -= self.schedules[game_id].cost
+            if budget < 0 and selected:
+                break
+            selected.append(game_id)
+
+        return selected
+
+    def update(
+        self,
+        game_id: int,
+        *,
+        streams: int,
+        new_streams: int,
+        now: Optional[float] = None,
+    ) -> None:
+        now = time.time() if now is None else now
+        schedule = self.schedules.get(game_id)
+        if schedule is None:
+            schedule = self.schedules[game_id] = GameSchedule(now)
+
+        if schedule.last_poll is not None:
+            elapsed = max(now - schedule.last_poll, 1)
+            schedule.rate += SMOOTHING * (new_streams / elapsed - schedule.rate)
+
+            if schedule.rate > 0:
+                interval = TARGET_NEW_STREAMS / schedule.rate
+            else:
+                interval = schedule.interval * 2
+            schedule.interval = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+
+        schedule.streams = streams
+        schedule.last_poll = now
+        schedule.next_poll = now + schedule.interval
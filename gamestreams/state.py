@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .utils import Stream
+
+
+class StreamState(NamedTuple):
+    """What is kept between polls about a live stream that was seen starting."""
+
+    viewer_count: int
+    peak_viewers: int
+
+
+class AnnouncedStream:
+    """What is kept about a stream announced in tracked messages until it ends."""
+
+    __slots__ = (
+        "id",
+        "title",
+        "user_name",
+        "user_login",
+        "game_name",
+        "started_at",
+        "peak_viewers",
+        "messages",
+    )
+
+    def __init__(self, stream: Stream) -> None:
+        self.id: int = stream.id
+        self.title: str = stream.title
+        self.user_name: str = stream.user_name
+        self.user_login: str = stream.user_login
+        self.game_name: str = stream.game_name
+        self.started_at: str = stream.raw_started_at
+        self.peak_viewers: int = stream.viewer_count  # Updated once the stream ends.
+        # (channel ID, message ID) of the announcements to update once the stream ends.
+        self.messages: List[Tuple[int, int]] = []
+
+
+class StreamDelta(NamedTuple):
+    started: List[Stream]
+    # Streams seen starting whose viewer count changed, with their previous peak.
+    updated: List[Tuple[Stream, int]]
+    ended: Dict[int, int]  # Stream ID -> peak viewer count of streams seen starting
+
+
+class StreamStateStore:
+    """The live streams of every polled game, updated from each poll as a delta.
+
+    Only streams that are live are kept, ended streams are handed back once in the
+    delta and then dropped, so memory stays bounded by what is currently live.
+    Streams that were live before a game's first poll are never announced, only
+    their IDs are kept so they do not count as started.
+    """
+
+    def __init__(self) -> None:
+        # Game ID -> stream ID -> state, ``None`` for streams live before the first
+        # poll of the game.
+        self.games: Dict[int, Dict[int, Optional[StreamState]]] = {}
+
+    def __contains__(self, game_id: int) -> bool:
+        return game_id in self.games
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.games)
+
+    def get(self, game_id: int, stream_id: int) -> Optional[StreamState]:
+        return self.games.get(game_id, {}).get(stream_id)
+
+    def forget(self, game_id: int) -> List[int]:
+        """Drop a game's streams, returns their IDs."""
+        return list(self.games.pop(game_id, {}))
+
+    def apply(self, game_id: int, streams: List[Stream]) -> StreamDelta:
+        """Diff the streams of a poll against the last one.
+
+        The first poll of a game only records the live streams, nothing counts as
+        started since there is nothing to compare against. Changes to those streams
+        are not reported either.
+        """
+        previous = self.games.get(game_id)
+        first_poll = previous is None
+        if previous is None:
+            previous = {}
+
+        current: Dict[int, Optional[StreamState]] = {}
+        started: List[Stream] = []
+        updated: List[Tuple[Stream, int]] = []
+
+        for stream in streams:
+            # Streams can show up on two pages when their position shifts between
+            # page requests, only the first copy counts.
+            if stream.id in current:
+                continue
+
+            if stream.id not in previous:
+                if first_poll:
+                    current[stream.id] = None
+                else:
+                    current[stream.id] = StreamState(
+                        stream.viewer_count, stream.viewer_count
+                    )
+                    started.append(stream)
+                continue
+
+            state = previous.pop(stream.id)
+            if state is not None and state.viewer_count != stream.viewer_count:
+                updated.append((stream, state.peak_viewers))
+                state = StreamState(
+                    stream.viewer_count, max(state.peak_viewers, stream.viewer_count)
+                )
+            current[stream.id] = state
+
+        self.games[game_id] = current
+        return StreamDelta(
+            started,
+            updated,
+            {
+                stream_id: state.peak_viewers
+                for stream_id, state in previous.items()
+                if state is not None
+            },
+        )
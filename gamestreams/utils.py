@@ -2,40 +2,109 @@ from __future__ import annotations
 
 import asyncio
 import datetime
-import time
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Collection,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-import aiohttp
 import discord
 from iso639 import NonExistentLanguageError, to_name
-from redbot.cogs.streams.streamtypes import TWITCH_STREAMS_ENDPOINT, rnd
 
 from .exceptions import StreamFetchError
+from .http import Reauthorize, helix_get
+
+# Broadcaster languages Twitch lets streamers pick from.
+TWITCH_LANGUAGES = (
+    "ar", "bg", "ca", "cs", "da", "de", "el", "en", "es", "fi", "fr", "hi", "hu",
+    "id", "it", "ja", "ko", "ms", "nl", "no", "pl", "pt", "ro", "ru", "sk", "sv",
+    "th", "tl", "tr", "uk", "vi", "zh",
+)  # fmt: skip
+
+
+def _language_name(code: str) -> str:
+    try:
+        return to_name(code)
+    except NonExistentLanguageError:
+        return code
+
+
+LANGUAGES: Dict[str, str] = {code: _language_name(code) for code in TWITCH_LANGUAGES}
+
+
+def parse_timestamp(timestamp: str) -> datetime.datetime:
+    return datetime.datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(
+        tzinfo=datetime.timezone.utc
+    )
 
 
 class Stream:
-    def __init__(self, game: Game, data: dict) -> None:
+    """A live stream of a game, built by its provider.
+
+    Most streams are only ever compared by ID, so the fields that are costly to derive
+    (language name, start time and thumbnail) are computed on first access.
+    ``thumbnail_url`` may hold ``{width}`` and ``{height}`` placeholders, ``language``
+    is a language code and ``started_at`` is a UTC timestamp like
+    ``2024-01-01T00:00:00Z``.
+    """
+
+    __slots__ = (
+        "game",
+        "id",
+        "title",
+        "user_name",
+        "user_login",
+        "game_name",
+        "viewer_count",
+        "is_mature",
+        "tags",
+        "_thumbnail_url",
+        "_language",
+        "_started_at",
+        "_image",
+        "_language_name",
+        "_started_at_datetime",
+    )
+
+    def __init__(
+        self,
+        game: Game,
+        *,
+        id: int,
+        title: str,
+        user_name: str,
+        user_login: str,
+        game_name: str,
+        viewer_count: int,
+        is_mature: bool,
+        tags: List[str],
+        thumbnail_url: str,
+        language: str,
+        started_at: str,
+    ) -> None:
         self.game = game
-        self.data = data
-
-        self.id: int = int(data["id"])
-        self.title: str = data["title"]
-        self.user_name: str = data["user_name"]
-        self.user_login: str = data["user_login"]
-        self.game_name: str = data["game_name"]
-        self.image: str = data["thumbnail_url"].format(width=1920, height=1080)
-        self.viewer_count: int = data["viewer_count"]
-
-        try:
-            self.language: str = to_name(data["language"])
-        except NonExistentLanguageError:
-            self.language: str = data["language"]
-
-        self.started_at: datetime.datetime = datetime.datetime.strptime(
-            data["started_at"], "%Y-%m-%dT%H:%M:%SZ"
-        ).replace(tzinfo=datetime.timezone.utc)
-        self.is_mature: bool = data["is_mature"]
-        self.tags: List[str] = data["tags"]
+
+        self.id = id
+        self.title = title
+        self.user_name = user_name
+        self.user_login = user_login
+        self.game_name = game_name
+        self.viewer_count = viewer_count
+        self.is_mature = is_mature
+        self.tags = tags
+
+        self._thumbnail_url = thumbnail_url
+        self._language = language
+        self._started_at = started_at
+
+        self._image: Optional[str] = None
+        self._language_name: Optional[str] = None
+        self._started_at_datetime: Optional[datetime.datetime] = None
 
     def __hash__(self) -> int:
         return hash(self.id)
@@ -43,121 +112,146 @@ class Stream:
     def __eq__(self, other: Stream) -> bool:
         return self.id == other.id
 
-    def make_embed(self) -> discord.Embed:
-        embed = discord.Embed(
-            title=self.title,
-            description=f"**{self.user_name}** is streaming **{self.game_name}**",
-            url=f"https://twitch.tv/{self.user_login}",
-            color=discord.Color.purple(),
-        )
+    @property
+    def image(self) -> str:
+        if self._image is None:
+            self._image = self._thumbnail_url.format(width=1920, height=1080)
+        return self._image
 
-        embed.set_image(url=rnd(self.image))
-        embed.set_thumbnail(url=self.game.image)
+    @property
+    def language_code(self) -> str:
+        return self._language
 
-        embed.add_field(
-            name="Viewer Count",
-            value=f"{self.viewer_count} viewers",
-            inline=False,
-        )
-        embed.add_field(name="Language", value=self.language, inline=False)
-        embed.add_field(
-            name="Started",
-            value=f"{discord.utils.format_dt(self.started_at, style='R')} ({discord.utils.format_dt(self.started_at)})",
-            inline=False,
-        )
-        embed.add_field(
-            name="Is Adult Stream?",
-            value="Yes" if self.is_mature else "No",
-            inline=False,
-        )
-        if self.tags:
-            embed.add_field(name="Tags", value=", ".join(self.tags), inline=False)
-        return embed
+    @property
+    def language(self) -> str:
+        if self._language_name is None:
+            name = LANGUAGES.get(self._language)
+            if name is None:
+                name = LANGUAGES[self._language] = _language_name(self._language)
+            self._language_name = name
+        return self._language_name
+
+    @property
+    def started_at(self) -> datetime.datetime:
+        if self._started_at_datetime is None:
+            self._started_at_datetime = parse_timestamp(self._started_at)
+        return self._started_at_datetime
+
+    @property
+    def raw_started_at(self) -> str:
+        return self._started_at
 
 
 class Game:
-    _rate_limit_resets = set()
-    _rate_limit_remaining = 800  # Assuming an initial limit of 800 requests per minute
+    """A game of a provider, ``headers`` are those it was looked up with."""
 
-    def __init__(self, data: dict, headers: dict) -> None:
-        self.data = data
+    def __init__(self, *, id: int, name: str, image: str, headers: dict) -> None:
+        self.id = id
+        self.name = name
+        self.image = image
         self.headers = headers
 
-        self.name = self.data["name"]
-        self.id: int = int(data["id"])
-        self.image: str = data["box_art_url"].format(width=180, height=180)
-
     def __hash__(self) -> int:
         return hash(self.id)
 
     def __eq__(self, other: Game) -> bool:
         return self.id == other.id
 
-    async def wait_for_rate_limit_reset(self) -> None:
-        """Check rate limits in response header and ensure we're following them.
-
-        From python-twitch-client and adapted to asyncio from Trusty-cogs:
-        https://github.com/tsifrer/python-twitch-client/blob/master/twitch/helix/base.py
-        https://github.com/TrustyJAID/Trusty-cogs/blob/master/twitch/twitch_api.py
-        """
-        current_time = int(time.time())
-        self._rate_limit_resets = {
-            x for x in self._rate_limit_resets if x > current_time
-        }
-
-        if self._rate_limit_remaining == 0:
-            if self._rate_limit_resets:
-                reset_time = next(iter(self._rate_limit_resets))
-                wait_time = reset_time - current_time + 0.1
-                await asyncio.sleep(wait_time)
-
-    async def fetch_streams(self, cursor: Optional[str] = None) -> List[Stream]:
-        streams: List[Stream] = []
-
-        await self.wait_for_rate_limit_reset()
-
-        async with aiohttp.ClientSession() as session:
-            params: Dict[str, Any] = {"game_id": self.id, "first": 100, "type": "live"}
-            if cursor:
-                params["after"] = cursor
-
-            async with session.get(
-                TWITCH_STREAMS_ENDPOINT,
-                headers=self.headers,
-                params=params,
-            ) as response:
-                if response.status == 429:
-                    reset = response.headers.get("Ratelimit-Reset")
-                    if reset:
-                        self._rate_limit_resets.add(int(reset))
-                    await self.wait_for_rate_limit_reset()
-
-                    # Retry the request with the same cursor
-                    return await self.fetch_streams(cursor=cursor)
-
-                if response.status != 200:
-                    raise StreamFetchError(
-                        f"Error {response.status} was raised while fetching streams."
-                    )
-
-                data = await response.json()
-                for stream_data in data.get("data", []):
-                    stream = Stream(self, stream_data)
-                    streams.append(stream)
-
-                # Check if there's more data to fetch
-                next_cursor = data.get("pagination", {}).get("cursor")
-                if next_cursor:
-                    # Recursively fetch more streams with the next cursor
-                    more_streams = await self.fetch_streams(cursor=next_cursor)
-                    streams.extend(more_streams)
-
-            remaining = response.headers.get("Ratelimit-Remaining")
-            if remaining:
-                self._rate_limit_remaining = int(remaining)
-
-            reset = response.headers.get("Ratelimit-Reset")
-            if reset:
-                self._rate_limit_resets.add(int(reset))
-
-        return sorted(streams, key=lambda stream: stream.viewer_count, reverse=True)
+
+async def iter_stream_data_pages(
+    params: List[Tuple[str, Any]],
+    *,
+    headers: dict,
+    first: int = 100,
+    cursor: Optional[str] = None,
+    url: Optional[str] = None,
+    reauthorize: Optional[Reauthorize] = None,
+) -> AsyncIterator[List[dict]]:
+    """Page through the Helix streams endpoint, yielding the raw data of every page.
+
+    Every page goes through the shared rate limiter, nothing is held open while the
+    caller is not consuming the generator.
+    """
+    while True:
+        page, cursor = await fetch_stream_data_page(
+            params,
+            headers=headers,
+            first=first,
+            cursor=cursor,
+            url=url,
+            reauthorize=reauthorize,
+        )
+        if page:
+            yield page
+
+        if not cursor or not page:
+            return
+
+
+async def fetch_stream_data_page(
+    params: List[Tuple[str, Any]],
+    *,
+    headers: dict,
+    first: int = 100,
+    cursor: Optional[str] = None,
+    url: Optional[str] = None,
+    reauthorize: Optional[Reauthorize] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one page of the Helix streams endpoint and the cursor of the next one."""
+    params = [*params, ("first", first), ("type", "live")]
+    if cursor is not None:
+        params.append(("after", cursor))
+
+    data = await helix_get(
+        "streams",
+        headers=headers,
+        params=params,
+        error=StreamFetchError,
+        url=url,
+        reauthorize=reauthorize,
+    )
+    return data.get("data", []), data.get("pagination", {}).get("cursor") or None
+
+
+async def fetch_stream_data_for_games(
+    games: Sequence[Game],
+    *,
+    headers: dict,
+    url: Optional[str] = None,
+    languages: Optional[Collection[str]] = None,
+    reauthorize: Optional[Reauthorize] = None,
+) -> Dict[Game, List[dict]]:
+    """Fetch the raw data of the live streams of many games at once.
+
+    Helix accepts up to 100 ``game_id`` parameters per request, so the games are
+    grouped into chunks of 100 and every chunk is paged through as a single
+    listing, the streams are then split back out per game. ``languages`` limits
+    the listing to streams in those languages.
+    """
+    streams: Dict[Game, List[dict]] = {game: [] for game in games}
+    games_by_id: Dict[int, Game] = {game.id: game for game in games}
+
+    async def fetch_chunk(games_chunk: List[Game]) -> None:
+        params: List[Tuple[str, Any]] = [("game_id", game.id) for game in games_chunk]
+        params.extend(("language", language) for language in languages or ())
+
+        async for page in iter_stream_data_pages(
+            params, headers=headers, url=url, reauthorize=reauthorize
+        ):
+            for stream_data in page:
+                game = games_by_id.get(int(stream_data["game_id"]))
+                if game is not None:
+                    streams[game].append(stream_data)
+
+    # Chunks are independent listings, the rate limiter decides how many run at once.
+    await asyncio.gather(
+        *(
+            fetch_chunk(games_chunk)
+            for games_chunk in discord.utils.as_chunks(list(games_by_id.values()), 100)
+        )
+    )
+
+    for game_streams in streams.values():
+        game_streams.sort(key=lambda stream: stream["viewer_count"], reverse=True)
+
+    return streams
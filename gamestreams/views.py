@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import discord
+from redbot.core.utils.views import SimpleMenu
+from redbot.vendored.discord.ext import menus
+
+from .cache import EmbedCache
+from .listings import StreamListings
+from .utils import Game, Stream
+
+
+class StreamPager:
+    """Lazily loads the streams of a game, one Helix page of ``page_size`` at a time.
+
+    The pages come from the shared listing of the game, so searches running at the
+    same time page through Helix only once.
+    """
+
+    def __init__(
+        self, game: Game, *, listings: StreamListings, page_size: int = 100
+    ) -> None:
+        self.game = game
+        self.listings = listings
+        self.page_size = page_size
+        self.listing = listings.get(game)
+
+    @property
+    def streams(self) -> List[Stream]:
+        return self.listing.streams
+
+    @property
+    def exhausted(self) -> bool:
+        return self.listing.exhausted
+
+    async def load(self, count: int) -> None:
+        """Make sure at least ``count`` streams are loaded, if that many exist."""
+        await self.listings.load(
+            self.game, self.listing, count, page_size=self.page_size
+        )
+
+
+class StreamPageSource(menus.ListPageSource):
+    def __init__(
+        self, pager: StreamPager, *, embeds: EmbedCache, icon_url: Any
+    ) -> None:
+        super().__init__(pager.streams, per_page=1)
+        self.pager = pager
+        self.embeds = embeds
+        self.icon_url = icon_url
+
+    async def load(self, page_number: int) -> None:
+        # Always keep one page loaded ahead so the forward button has somewhere to go.
+        await self.pager.load(page_number + 2)
+        self._max_pages = len(self.entries)
+
+    def is_paginating(self) -> bool:
+        # A pager that is not exhausted has more pages than are loaded so far.
+        return not self.pager.exhausted or super().is_paginating()
+
+    async def format_page(self, view: StreamsMenu, stream: Stream) -> discord.Embed:
+        embed = self.embeds.get(stream).copy()
+        total = f"{len(self.entries)}{'' if self.pager.exhausted else '+'}"
+        embed.set_footer(
+            text=f"Page {view.current_page % len(self.entries) + 1}/{total}",
+            icon_url=self.icon_url,
+        )
+        return embed
+
+
+class StreamsMenu(SimpleMenu):
+    """A SimpleMenu that renders stream embeds on demand and fetches more streams
+    from Helix once the user pages past what has been loaded."""
+
+    def __init__(self, source: StreamPageSource, **kwargs: Any) -> None:
+        super().__init__(source.entries, **kwargs)  # type: ignore
+        self._source = source
+
+        # SimpleMenu only adds the navigation buttons for more than one loaded
+        # stream, searches that loaded a single one can still page to more.
+        if (
+            source.is_paginating()
+            and not self.use_select_only
+            and self.forward_button not in self.children
+        ):
+            for button in (
+                self.first_button,
+                self.backward_button,
+                self.forward_button,
+                self.last_button,
+            ):
+                self.add_item(button)
+
+    async def get_page(self, page_num: int) -> Dict[str, Optional[Any]]:
+        if page_num >= 0:
+            await self.source.load(page_num)
+            self.last_button.direction = self.source.get_max_pages()
+
+        return await super().get_page(page_num)
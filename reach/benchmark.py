@@ -0,0 +1,180 @@
+"""Benchmark the reach engine against the original algorithm on synthetic guilds.
+
+Run it from the repository root with Red installed::
+
+    python -m reach.benchmark --members 1000 10000 100000 --queries 20
+
+Every scale builds a guild with ``reach.fixtures``, draws random queries of roles,
+@everyone and @here over its channels and answers each of them with the original
+member by member algorithm and with the bitset engine. Any query whose numbers
+differ is printed and makes the run exit with an error. The engine's time is
+split into building the index and answering the queries from it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import List, Sequence, Set, Tuple
+
+import discord
+
+from .fixtures import make_guild
+from .index import RoleIndex, Target, compute_reach_many
+
+# Member counts and reach percentages of every line, members reached and targeted.
+Result = Tuple[List[Tuple[int, float]], int, int]
+
+
+def legacy_reach(
+    guild: discord.Guild, channel: discord.TextChannel, targets: Sequence[Target]
+) -> Result:
+    """The reach command as it was first written, member by member."""
+    members: Set[discord.Member] = set()
+    total_members: Set[discord.Member] = set()
+    lines: List[Tuple[int, float]] = []
+
+    for target in targets:
+        if target == "everyone":
+            for member in guild.default_role.members:
+                total_members.add(member)
+                if channel.permissions_for(member).read_messages:
+                    members.add(member)
+            everyone = len(guild.default_role.members)
+            lines.append((everyone, 100 * len(members) / everyone))
+        elif target == "here":
+            for member in guild.members:
+                if member.status != discord.Status.offline:
+                    total_members.add(member)
+                    if channel.permissions_for(member).read_messages:
+                        members.add(member)
+            lines.append((len(total_members), 100 * len(members) / len(total_members)))
+        else:
+            assert isinstance(target, discord.Role)
+            for member in target.members:
+                total_members.add(member)
+                if channel.permissions_for(member).read_messages:
+                    members.add(member)
+            lines.append(
+                (len(target.members), 100 * len(target.members) / len(total_members))
+            )
+
+    return lines, len(members), len(total_members)
+
+
+def make_queries(
+    guild: discord.Guild, count: int, rng: random.Random
+) -> List[Tuple[discord.TextChannel, List[Target]]]:
+    # Roles without members would divide by zero in the original algorithm.
+    roles: List[Target] = [role for role in guild.roles if role.members]
+    choices = roles + ["everyone", "here"]
+    return [
+        (
+            rng.choice(guild.text_channels),
+            rng.sample(choices, rng.randint(1, min(4, len(choices)))),
+        )
+        for _ in range(count)
+    ]
+
+
+def run(args: argparse.Namespace) -> bool:
+    print(
+        f"{args.roles} roles, {args.channels} channels, {args.queries} queries, "
+        f"{args.online:.0%} online"
+    )
+    print(
+        f"{'members':>8} {'fixture':>8} {'legacy':>8} {'build':>8} "
+        f"{'engine':>8} {'speedup':>8} {'same':>5}"
+    )
+
+    all_same = True
+    for members in args.members:
+        rng = random.Random(args.seed)
+        started = time.perf_counter()
+        guild = make_guild(
+            members=members,
+            roles=args.roles,
+            channels=args.channels,
+            online=args.online,
+            seed=args.seed,
+        )
+        fixture = time.perf_counter() - started
+        queries = make_queries(guild, args.queries, rng)
+
+        legacy_results: List[Result] = []
+        legacy = 0.0
+        if members <= args.legacy_limit:
+            started = time.perf_counter()
+            for channel, targets in queries:
+                legacy_results.append(legacy_reach(guild, channel, targets))
+            legacy = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = RoleIndex(guild)
+        index.rebuild()
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reports = [
+            compute_reach_many(index, [channel], targets)[0]
+            for channel, targets in queries
+        ]
+        engine = time.perf_counter() - started
+
+        same = True
+        for (channel, targets), expected, report in zip(
+            queries, legacy_results, reports
+        ):
+            result = (
+                [(line.members, line.percent) for line in report.lines],
+                report.reached,
+                report.targeted,
+            )
+            if result != expected:
+                same = False
+                print(f"  mismatch in #{channel.name} for {targets}:")
+                print(f"    legacy {expected}")
+                print(f"    engine {result}")
+        all_same = all_same and same
+
+        if legacy_results:
+            speedup = f"{legacy / engine:>7.0f}x" if engine else f"{'-':>8}"
+            print(
+                f"{members:>8} {fixture:>8.2f} {legacy:>8.3f} {build:>8.3f} "
+                f"{engine:>8.3f} {speedup} {str(same):>5}"
+            )
+        else:
+            print(
+                f"{members:>8} {fixture:>8.2f} {'-':>8} {build:>8.3f} "
+                f"{engine:>8.3f} {'-':>8} {'-':>5}"
+            )
+
+    return all_same
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--members", type=int, nargs="+", default=[1000, 10_000, 100_000]
+    )
+    parser.add_argument("--roles", type=int, default=50)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument(
+        "--online", type=float, default=0.2, help="Fraction of members online."
+    )
+    parser.add_argument(
+        "--legacy-limit",
+        type=int,
+        default=200_000,
+        help="Largest guild the original algorithm is run on, it gets slow.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    if not run(parser.parse_args()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import collections
+from typing import Hashable, NamedTuple, Optional, OrderedDict, Sequence, Tuple
+
+import discord
+
+from .index import ReachReport, Target
+from .permissions import ViewResolver
+
+MAX_CACHED_REPORTS = 512
+
+# Channel ID and the role IDs or mention names of the targets.
+ReportKey = Tuple[int, Tuple[Hashable, ...]]
+
+
+class CachedReport(NamedTuple):
+    guild_id: int
+    version: Hashable  # ``ViewResolver.version`` of the channel.
+    # ``RoleIndex.epoch`` of the index the report was worked out from, along with
+    # its ``presence_epoch`` when @here is targeted.
+    epoch: Hashable
+    report: ReachReport
+
+
+class ReachCache:
+    """Reach reports keyed by channel and targets.
+
+    A report is only served while the channel's permission data and the member
+    epoch of the guild's index still match the ones it was worked out from, the
+    events that change either also drop it right away. Reports that target @here
+    also need the same members online. The least recently used
+    reports are evicted once ``maxsize`` is reached.
+    """
+
+    def __init__(self, *, maxsize: int = MAX_CACHED_REPORTS) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[ReportKey, CachedReport] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(viewer: ViewResolver, targets: Sequence[Target]) -> ReportKey:
+        return (
+            viewer.channel_id,
+            tuple(
+                target.id if isinstance(target, discord.Role) else target
+                for target in targets
+            ),
+        )
+
+    def get(
+        self, viewer: ViewResolver, targets: Sequence[Target], *, epoch: Hashable
+    ) -> Optional[ReachReport]:
+        key = self._key(viewer, targets)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.version != viewer.version or entry.epoch != epoch:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.report
+
+    def set(
+        self,
+        viewer: ViewResolver,
+        targets: Sequence[Target],
+        report: ReachReport,
+        *,
+        epoch: Hashable,
+    ) -> None:
+        key = self._key(viewer, targets)
+        self._entries[key] = CachedReport(
+            viewer.guild_id, viewer.version, epoch, report
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate_channel(self, channel_id: int) -> None:
+        for key in [key for key in self._entries if key[0] == channel_id]:
+            del self._entries[key]
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        for key in [
+            key for key, entry in self._entries.items() if entry.guild_id == guild_id
+        ]:
+            del self._entries[key]
@@ -0,0 +1,192 @@
+"""Synthetic guilds to exercise Reach without Discord.
+
+Guilds are built from generated gateway payloads through discord.py's own parsing,
+so roles, members, presences and channel overwrites behave as they do on a live
+bot. Nothing is connected, the guilds only have a cache.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, List
+
+import discord
+from discord.state import ConnectionState
+
+# Discord's epoch in milliseconds, IDs are generated as snowflakes after it so that
+# members hash like real ones.
+DISCORD_EPOCH = 1420070400000
+GUILD_ID = DISCORD_EPOCH << 22
+
+VIEW_CHANNEL = discord.Permissions(view_channel=True).value
+ADMINISTRATOR = discord.Permissions(administrator=True).value
+MODERATOR = discord.Permissions(manage_messages=True, kick_members=True).value
+
+ONLINE_STATUSES = ("online", "online", "idle", "dnd")
+
+
+def snowflake(offset: int) -> int:
+    return (DISCORD_EPOCH + offset) << 22
+
+
+def _make_state() -> ConnectionState:
+    return ConnectionState(
+        dispatch=lambda *args: None,
+        handlers={},
+        hooks={},
+        http=None,  # type: ignore
+        intents=discord.Intents.all(),
+        chunk_guilds_at_startup=False,
+        member_cache_flags=discord.MemberCacheFlags.all(),
+    )
+
+
+def _role(role_id: int, name: str, permissions: int, position: int) -> dict:
+    return {
+        "id": str(role_id),
+        "name": name,
+        "permissions": str(permissions),
+        "position": position,
+        "color": 0,
+        "hoist": False,
+        "managed": False,
+        "mentionable": False,
+    }
+
+
+def _overwrite(target_id: int, kind: int, *, allow: int = 0, deny: int = 0) -> dict:
+    return {"id": str(target_id), "type": kind, "allow": str(allow), "deny": str(deny)}
+
+
+def make_guild(
+    *,
+    members: int = 10_000,
+    roles: int = 50,
+    channels: int = 20,
+    online: float = 0.2,
+    seed: int = 0,
+) -> discord.Guild:
+    """Build a guild with ``members`` members, ``roles`` roles and text channels.
+
+    Role sizes follow what most community servers look like: a verified role
+    almost everyone has, a small muted role, a handful of admins and moderators and
+    the rest interest and ping roles whose sizes fall off with their rank. Channels
+    cycle through public, verified only, staff only and role gated ones, some with
+    overwrites for single members. ``online`` is the fraction of members that are
+    not offline.
+    """
+    rng = random.Random(seed)
+    member_ids = [snowflake(1_000_000 + i) for i in range(members)]
+
+    # Role IDs follow the guild ID, the default role shares the guild's ID.
+    admin_id, moderator_id, verified_id, muted_id = (snowflake(i) for i in (1, 2, 3, 4))
+    role_payloads = [
+        _role(GUILD_ID, "@everyone", discord.Permissions.general().value, 0),
+        _role(admin_id, "Admin", ADMINISTRATOR, roles),
+        _role(moderator_id, "Moderator", MODERATOR, roles - 1),
+        _role(verified_id, "Verified", 0, 2),
+        _role(muted_id, "Muted", 0, 1),
+    ]
+    sizes: Dict[int, int] = {
+        admin_id: min(5, members),
+        moderator_id: min(10 + members // 2000, members),
+        verified_id: int(members * 0.8),
+        muted_id: int(members * 0.01),
+    }
+    interest_ids: List[int] = []
+    for rank in range(1, max(roles - 4, 0) + 1):
+        role_id = snowflake(4 + rank)
+        interest_ids.append(role_id)
+        role_payloads.append(_role(role_id, f"Interest {rank}", 0, 2 + rank))
+        sizes[role_id] = min(int(members * 0.4 / rank**1.1), members)
+
+    member_roles: Dict[int, List[str]] = {member_id: [] for member_id in member_ids}
+    for role_id, size in sizes.items():
+        for member_id in rng.sample(member_ids, size):
+            member_roles[member_id].append(str(role_id))
+
+    member_payloads = [
+        {
+            "user": {
+                "id": str(member_id),
+                "username": f"member{i}",
+                "discriminator": "0",
+                "avatar": None,
+            },
+            "roles": member_roles[member_id],
+            "joined_at": None,
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        }
+        for i, member_id in enumerate(member_ids)
+    ]
+    presences = [
+        {
+            "user": {"id": str(member_id)},
+            "status": rng.choice(ONLINE_STATUSES),
+            "activities": [],
+            "client_status": {"desktop": "online"},
+        }
+        for member_id in rng.sample(member_ids, int(members * online))
+    ]
+
+    channel_payloads = []
+    for i in range(channels):
+        kind = i % 4
+        overwrites = []
+        if kind == 1:  # Verified only, muted members can only read.
+            overwrites = [
+                _overwrite(GUILD_ID, 0, deny=VIEW_CHANNEL),
+                _overwrite(verified_id, 0, allow=VIEW_CHANNEL),
+            ]
+        elif kind == 2:  # Staff only.
+            overwrites = [
+                _overwrite(GUILD_ID, 0, deny=VIEW_CHANNEL),
+                _overwrite(moderator_id, 0, allow=VIEW_CHANNEL),
+            ]
+        elif kind == 3 and interest_ids:  # Gated behind an interest role.
+            overwrites = [
+                _overwrite(GUILD_ID, 0, deny=VIEW_CHANNEL),
+                _overwrite(rng.choice(interest_ids), 0, allow=VIEW_CHANNEL),
+                _overwrite(muted_id, 0, deny=VIEW_CHANNEL),
+            ]
+
+        if members and rng.random() < 0.3:
+            for member_id in rng.sample(member_ids, min(rng.randint(1, 5), members)):
+                if rng.random() < 0.5:
+                    overwrites.append(_overwrite(member_id, 1, allow=VIEW_CHANNEL))
+                else:
+                    overwrites.append(_overwrite(member_id, 1, deny=VIEW_CHANNEL))
+
+        channel_payloads.append(
+            {
+                "id": str(snowflake(500_000 + i)),
+                "type": 0,
+                "name": f"channel-{i}",
+                "position": i,
+                "permission_overwrites": overwrites,
+            }
+        )
+
+    data = {
+        "id": str(GUILD_ID),
+        "name": "Reach Fixture",
+        "owner_id": str(member_ids[0]) if member_ids else "0",
+        "roles": role_payloads,
+        "members": member_payloads,
+        "presences": presences,
+        "channels": channel_payloads,
+        "member_count": members,
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "mfa_level": 0,
+        "premium_tier": 0,
+        "preferred_locale": "en-US",
+        "nsfw_level": 0,
+    }
+    return discord.Guild(data=data, state=_make_state())
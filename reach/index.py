@@ -0,0 +1,461 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import discord
+
+from .permissions import ADMINISTRATOR, VIEW_CHANNEL, ViewResolver
+
+if TYPE_CHECKING:
+    from .cache import ReachCache
+
+# A role, or "everyone" or "here" for the @everyone and @here mentions.
+Target = Union[discord.Role, str]
+
+try:
+    popcount = int.bit_count  # type: ignore # Python 3.10+
+except AttributeError:
+
+    def popcount(bits: int) -> int:
+        return bin(bits).count("1")
+
+
+def build_bitsets(
+    members: Sequence[discord.Member],
+) -> Tuple[Dict[int, int], Dict[int, int], Set[int]]:
+    """Give every member a bit index and every role the bits of its members.
+
+    Also returns the IDs of the members that are not offline.
+    """
+    slots = {member.id: slot for slot, member in enumerate(members)}
+    online = {
+        member.id for member in members if member.status != discord.Status.offline
+    }
+
+    # Bits are set in byte arrays first, setting them on an int one by one would
+    # copy the whole int every time.
+    role_bytes: Dict[int, bytearray] = {}
+    length = len(members) // 8 + 1
+    for slot, member in enumerate(members):
+        for role_id in member._roles:
+            array = role_bytes.get(role_id)
+            if array is None:
+                array = role_bytes[role_id] = bytearray(length)
+            array[slot >> 3] |= 1 << (slot & 7)
+
+    roles = {
+        role_id: int.from_bytes(array, "little")
+        for role_id, array in role_bytes.items()
+    }
+    return slots, roles, online
+
+
+class MemberBits:
+    """Role bitsets of a guild's members, answering view and target queries.
+
+    Snapshots of a ``RoleIndex`` are instances of this class. A snapshot copies the
+    role bitsets and is handed the bit indexes as they are, the index copies them
+    before its next join or leave, so a snapshot never changes after it was taken.
+    """
+
+    def __init__(
+        self, slots: Dict[int, int], everyone: int, roles: Dict[int, int]
+    ) -> None:
+        self.slots = slots  # Member ID -> bit index
+        self.everyone = everyone  # Bits of the members in the index.
+        self.roles = roles  # Role ID -> bits of its members
+
+    def __len__(self) -> int:
+        return popcount(self.everyone)
+
+    def bit(self, member_id: int) -> int:
+        slot = self.slots.get(member_id)
+        return 0 if slot is None else 1 << slot
+
+    def bits_of(self, member_ids: Iterable[int]) -> int:
+        length = self.everyone.bit_length()
+        array = bytearray(length // 8 + 1)
+        for member_id in member_ids:
+            slot = self.slots.get(member_id)
+            if slot is not None and slot < length:
+                array[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(array, "little") & self.everyone
+
+    def union(self, role_ids: Iterable[int]) -> int:
+        bits = 0
+        for role_id in role_ids:
+            bits |= self.roles.get(role_id, 0)
+        return bits & self.everyone
+
+    def viewers(self, viewer: ViewResolver) -> int:
+        """The bits of the members that can view the channel of ``viewer``.
+
+        Applies the same steps as ``GuildChannel.permissions_for`` to whole role
+        bitsets, then resolves the members with an overwrite of their own.
+        """
+        everyone = self.everyone
+        if viewer.default_permissions & ADMINISTRATOR:
+            return everyone
+
+        admins = self.union(viewer.roles_with(ADMINISTRATOR))
+        if viewer.default_permissions & VIEW_CHANNEL:
+            bits = everyone
+        else:
+            bits = self.union(viewer.roles_with(VIEW_CHANNEL))
+
+        if viewer.everyone_deny & VIEW_CHANNEL:
+            bits = 0
+        if viewer.everyone_allow & VIEW_CHANNEL:
+            bits = everyone
+
+        denies = self.union(viewer.overwrites_with(viewer.role_denies, VIEW_CHANNEL))
+        allows = self.union(viewer.overwrites_with(viewer.role_allows, VIEW_CHANNEL))
+        bits = (bits & ~denies) | allows | admins
+
+        for member_id, role_ids in viewer.individuals.items():
+            bit = self.bit(member_id)
+            if viewer.can_view(member_id, role_ids):
+                bits |= bit
+            else:
+                bits &= ~bit
+
+        return bits & everyone
+
+
+class RoleIndex(MemberBits):
+    """The role membership of a guild's members, held as bitsets.
+
+    Every cached member gets a dense bit index and every role an ``int`` with the
+    bits of its members set, so unions, intersections and counts over roles run
+    over whole bitsets at once. Built from the member cache in a worker thread and
+    then kept up to date from member join, leave and update events. The members
+    that are not offline are kept apart from presence updates, so @here only
+    looks at them.
+
+    The bits of members that left are not reused. Role bitsets may still have them
+    set, so they only count together with ``everyone``. The index is rebuilt once
+    more than half of its bits are unused.
+    """
+
+    def __init__(self, guild: discord.Guild) -> None:
+        super().__init__({}, 0, {})
+        self.guild = guild
+        self.size = 0  # Bit indexes handed out so far.
+        # Changes whenever a member joins, leaves or gets or loses a role.
+        self.epoch = 0
+        self.online: Set[int] = set()  # IDs of the members that are not offline.
+        # Changes whenever a member comes online or goes offline.
+        self.presence_epoch = 0
+        # What keeping the index up to date costs, shown by the stats command.
+        self.rebuilds = 0
+        self.rebuild_seconds = 0.0  # Of the last rebuild.
+        self.presence_updates = 0
+        self.presence_seconds = 0.0
+        self.lock = asyncio.Lock()
+        # Member events received while the index is rebuilt in a worker thread,
+        # ``None`` when no rebuild is running.
+        self.backlog: Optional[List[Tuple[Callable[..., None], Tuple[Any, ...]]]] = None
+        # Whether a snapshot was handed ``slots``, they are copied before changing.
+        self.slots_shared = False
+
+    def is_stale(self) -> bool:
+        # Members cached without an event, such as after chunking, only show up in
+        # the size of the cache.
+        return (
+            len(self.slots) != len(self.guild._members)  # type: ignore
+            or self.size > 2 * len(self.slots) + 1024
+        )
+
+    def load(
+        self, slots: Dict[int, int], roles: Dict[int, int], online: Set[int]
+    ) -> None:
+        self.slots = slots
+        self.slots_shared = False
+        self.roles = roles
+        self.online = online
+        self.size = len(slots)
+        self.everyone = (1 << self.size) - 1
+        self.epoch += 1
+        self.presence_epoch += 1
+        self.rebuilds += 1
+
+    def rebuild(self) -> None:
+        started = time.perf_counter()
+        self.load(*build_bitsets(list(self.guild._members.values())))  # type: ignore
+        self.rebuild_seconds = time.perf_counter() - started
+
+    async def refresh(self) -> None:
+        """Rebuild the index in a worker thread if it fell behind the member cache."""
+        async with self.lock:
+            if not self.is_stale():
+                return
+
+            members = list(self.guild._members.values())  # type: ignore
+            self.backlog = []
+            try:
+                started = time.perf_counter()
+                loop = asyncio.get_running_loop()
+                self.load(*await loop.run_in_executor(None, build_bitsets, members))
+                self.rebuild_seconds = time.perf_counter() - started
+            finally:
+                # Replaying is safe for events the rebuild already saw.
+                backlog, self.backlog = self.backlog, None
+                for event, args in backlog:
+                    event(*args)
+
+    def snapshot(self) -> MemberBits:
+        self.slots_shared = True
+        return MemberBits(self.slots, self.everyone, dict(self.roles))
+
+    def _own_slots(self) -> None:
+        # Snapshots may be read in a worker thread while the index changes.
+        if self.slots_shared:
+            self.slots = dict(self.slots)
+            self.slots_shared = False
+
+    def memory(self) -> int:
+        """Rough size in bytes of the bitsets, bit indexes and online set."""
+        return (
+            sum(sys.getsizeof(bits) for bits in self.roles.values())
+            + sys.getsizeof(self.everyone)
+            + sys.getsizeof(self.slots)
+            + sys.getsizeof(self.online)
+        )
+
+    def add(self, member: discord.Member) -> None:
+        if self.backlog is not None:
+            self.backlog.append((self.add, (member,)))
+            return
+        if member.id in self.slots:
+            return
+
+        self._own_slots()
+        slot = self.slots[member.id] = self.size
+        self.size += 1
+        self.epoch += 1
+        bit = 1 << slot
+        self.everyone |= bit
+        for role_id in member._roles:
+            self.roles[role_id] = self.roles.get(role_id, 0) | bit
+        if member.status != discord.Status.offline:
+            self.online.add(member.id)
+            self.presence_epoch += 1
+
+    def remove(self, member: discord.Member) -> None:
+        if self.backlog is not None:
+            self.backlog.append((self.remove, (member,)))
+            return
+
+        if member.id in self.slots:
+            self._own_slots()
+        slot = self.slots.pop(member.id, None)
+        if slot is not None:
+            self.everyone &= ~(1 << slot)
+            self.epoch += 1
+        if member.id in self.online:
+            self.online.discard(member.id)
+            self.presence_epoch += 1
+
+    def update(self, before: discord.Member, after: discord.Member) -> None:
+        if before._roles == after._roles:
+            return
+        if self.backlog is not None:
+            self.backlog.append((self.update, (before, after)))
+            return
+
+        slot = self.slots.get(after.id)
+        if slot is None:
+            return
+
+        self.epoch += 1
+        bit = 1 << slot
+        before_roles = set(before._roles)
+        after_roles = set(after._roles)
+        for role_id in before_roles - after_roles:
+            if role_id in self.roles:
+                self.roles[role_id] &= ~bit
+        for role_id in after_roles - before_roles:
+            self.roles[role_id] = self.roles.get(role_id, 0) | bit
+
+    def update_presence(self, member: discord.Member) -> None:
+        if self.backlog is not None:
+            self.backlog.append((self.update_presence, (member,)))
+            return
+
+        started = time.perf_counter()
+        if member.id in self.slots:
+            online = member.status != discord.Status.offline
+            if online != (member.id in self.online):
+                if online:
+                    self.online.add(member.id)
+                else:
+                    self.online.discard(member.id)
+                self.presence_epoch += 1
+
+        self.presence_updates += 1
+        self.presence_seconds += time.perf_counter() - started
+
+
+class ReachLine(NamedTuple):
+    target: Target
+    members: int
+    percent: float
+
+
+class ReachReport(NamedTuple):
+    lines: List[ReachLine]
+    reached: int
+    targeted: int
+
+
+def _percent(part: int, whole: int) -> float:
+    return 100 * part / whole if whole else 0.0
+
+
+class ReachJob(NamedTuple):
+    """Everything a reach computation reads, copied so it can run in a thread."""
+
+    bits: MemberBits
+    viewers: List[ViewResolver]
+    targets: List[Target]
+    # IDs of the online members when @here is targeted.
+    online: Tuple[int, ...]
+
+    def run(self) -> List[ReachReport]:
+        """Work out the reach of the targets in every channel from the bitsets.
+
+        The targets are resolved once, each channel then only costs a few bitset
+        operations. The numbers follow the original reach command: a role's line
+        shows its member count over everyone targeted so far, the @everyone and
+        @here lines show the members reached so far over all and over the online
+        members.
+        """
+        index = self.bits
+
+        # Bits of each target and of everyone targeted up to and including it.
+        resolved: List[Tuple[Target, int, int]] = []
+        targeted = 0
+        for target in self.targets:
+            if isinstance(target, discord.Role):
+                if target.is_default():
+                    bits = index.everyone
+                else:
+                    bits = index.union([target.id])
+            elif target == "everyone":
+                bits = index.everyone
+            else:
+                bits = index.bits_of(self.online)
+            targeted |= bits
+            resolved.append((target, bits, targeted))
+
+        total = popcount(index.everyone)
+        reports: List[ReachReport] = []
+        for viewer in self.viewers:
+            viewers = index.viewers(viewer)
+            lines: List[ReachLine] = []
+            for target, bits, targeted_so_far in resolved:
+                if isinstance(target, discord.Role):
+                    members = popcount(bits)
+                    percent = _percent(members, popcount(targeted_so_far))
+                elif target == "everyone":
+                    members = total
+                    percent = _percent(popcount(viewers & targeted_so_far), total)
+                else:
+                    members = popcount(targeted_so_far)
+                    percent = _percent(popcount(viewers & targeted_so_far), members)
+                lines.append(ReachLine(target, members, percent))
+
+            reports.append(
+                ReachReport(lines, popcount(viewers & targeted), popcount(targeted))
+            )
+
+        return reports
+
+
+def prepare_reach(
+    index: RoleIndex, viewers: Sequence[ViewResolver], targets: Sequence[Target]
+) -> ReachJob:
+    """Copy what a reach computation needs out of the guild, on the event loop."""
+    online: Tuple[int, ...] = ()
+    if "here" in targets:
+        online = tuple(index.online)
+
+    return ReachJob(
+        index.snapshot(),
+        list(viewers),
+        list(targets),
+        online,
+    )
+
+
+async def run_reach(
+    index: RoleIndex,
+    channels: Sequence[discord.abc.GuildChannel],
+    targets: Sequence[Target],
+    *,
+    cache: Optional[ReachCache] = None,
+) -> List[ReachReport]:
+    """Work out the reach of ``targets`` in every channel in a worker thread.
+
+    Reports found in ``cache`` are served from it, only the other channels are
+    worked out and then cached.
+    """
+    await index.refresh()
+    viewers = [ViewResolver(channel) for channel in channels]
+
+    epoch: Hashable = index.epoch
+    if "here" in targets:
+        epoch = (index.epoch, index.presence_epoch)
+    reports: List[Optional[ReachReport]] = [
+        cache.get(viewer, targets, epoch=epoch) if cache is not None else None
+        for viewer in viewers
+    ]
+    missing = [viewer for viewer, report in zip(viewers, reports) if report is None]
+    if not missing:
+        return reports  # type: ignore
+
+    job = prepare_reach(index, missing, targets)
+    computed = iter(await asyncio.get_running_loop().run_in_executor(None, job.run))
+    for position, viewer in enumerate(viewers):
+        if reports[position] is None:
+            report = reports[position] = next(computed)
+            if cache is not None:
+                cache.set(viewer, targets, report, epoch=epoch)
+
+    return reports  # type: ignore
+
+
+def compute_reach_many(
+    index: RoleIndex,
+    channels: Sequence[discord.abc.GuildChannel],
+    targets: Sequence[Target],
+) -> List[ReachReport]:
+    """Work out the reach of ``targets`` in every channel on the calling thread."""
+    if index.is_stale():
+        index.rebuild()
+    viewers = [ViewResolver(channel) for channel in channels]
+    return prepare_reach(index, viewers, targets).run()
+
+
+def compute_reach(
+    index: RoleIndex, channel: discord.abc.GuildChannel, targets: Sequence[Target]
+) -> ReachReport:
+    """Work out the reach of ``targets`` in ``channel`` on the calling thread."""
+    return compute_reach_many(index, [channel], targets)[0]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+import discord
+
+VIEW_CHANNEL = discord.Permissions(view_channel=True).value
+ADMINISTRATOR = discord.Permissions(administrator=True).value
+
+
+class ViewResolver:
+    """The permission data that decides who can view a channel.
+
+    Members with the same roles always get the same channel permissions, so view
+    access is worked out per role from the permissions of the roles and the
+    channel's overwrites, the way discord.py does it for a member. Members with an
+    overwrite of their own and the guild owner are resolved one by one.
+
+    Everything is copied out of the channel and guild when it is built, so it can
+    be read from another thread while the guild changes.
+    """
+
+    def __init__(self, channel: discord.abc.GuildChannel) -> None:
+        guild = channel.guild
+        self.channel_id = channel.id
+        self.guild_id = guild.id
+        self.owner_id = guild.owner_id
+        self.default_permissions = guild.default_role.permissions.value
+        self.role_permissions: Dict[int, int] = {
+            role.id: role.permissions.value for role in guild.roles
+        }
+
+        self.everyone_allow = 0
+        self.everyone_deny = 0
+        self.role_allows: Dict[int, int] = {}
+        self.role_denies: Dict[int, int] = {}
+        # Member ID -> allow and deny of the member's own overwrite
+        self.member_overwrites: Dict[int, Tuple[int, int]] = {}
+
+        for overwrite in channel._overwrites:  # type: ignore
+            if overwrite.id == guild.id:
+                self.everyone_allow = overwrite.allow
+                self.everyone_deny = overwrite.deny
+            elif overwrite.is_role():
+                self.role_allows[overwrite.id] = overwrite.allow
+                self.role_denies[overwrite.id] = overwrite.deny
+            else:
+                self.member_overwrites[overwrite.id] = (overwrite.allow, overwrite.deny)
+
+        # Member ID -> role IDs of the members resolved one by one.
+        self.individuals: Dict[int, Tuple[int, ...]] = {}
+        for member_id in {*self.member_overwrites, self.owner_id}:
+            member = guild.get_member(member_id)
+            if member is not None:
+                self.individuals[member_id] = tuple(member._roles)
+
+    @property
+    def version(self) -> Hashable:
+        """Equal for two resolvers exactly when their view access data is equal."""
+        return (
+            self.owner_id,
+            self.default_permissions,
+            tuple(self.role_permissions.items()),
+            self.everyone_allow,
+            self.everyone_deny,
+            tuple(self.role_allows.items()),
+            tuple(self.role_denies.items()),
+            tuple(self.member_overwrites.items()),
+        )
+
+    def is_individual(self, member_id: int) -> bool:
+        """Whether a member's permissions depend on more than its roles."""
+        return member_id in self.member_overwrites or member_id == self.owner_id
+
+    def can_view(self, member_id: int, role_ids: Iterable[int]) -> bool:
+        """Whether a member with ``role_ids`` can view the channel.
+
+        Follows ``GuildChannel.permissions_for`` for the view channel permission.
+        """
+        if member_id == self.owner_id:
+            return True
+
+        role_ids = tuple(role_ids)
+        permissions = self.default_permissions
+        for role_id in role_ids:
+            permissions |= self.role_permissions.get(role_id, 0)
+        if permissions & ADMINISTRATOR:
+            return True
+
+        permissions = (permissions & ~self.everyone_deny) | self.everyone_allow
+
+        allow = deny = 0
+        for role_id in role_ids:
+            allow |= self.role_allows.get(role_id, 0)
+            deny |= self.role_denies.get(role_id, 0)
+        permissions = (permissions & ~deny) | allow
+
+        member_allow, member_deny = self.member_overwrites.get(member_id, (0, 0))
+        permissions = (permissions & ~member_deny) | member_allow
+
+        return bool(permissions & VIEW_CHANNEL)
+
+    def roles_with(self, permission: int) -> List[int]:
+        """IDs of the roles that grant ``permission`` guild wide."""
+        return [
+            role_id
+            for role_id, permissions in self.role_permissions.items()
+            if permissions & permission and role_id != self.guild_id
+        ]
+
+    def overwrites_with(self, overwrites: Dict[int, int], permission: int) -> List[int]:
+        """IDs of the roles whose channel overwrite sets ``permission``."""
+        return [
+            role_id
+            for role_id, permissions in overwrites.items()
+            if permissions & permission
+        ]
@@ -22,16 +22,20 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from typing import Union
+from typing import Dict, List, Optional, Union
 
 import discord
 from redbot.core import Config, commands
+from redbot.core.utils.chat_formatting import box, pagify
+
+from .cache import ReachCache
+from .index import RoleIndex, Target, run_reach
 
 
 class Reach(commands.Cog):
     """Shows the reach of roles in a channel"""
 
-    __version__ = "1.0.0"
+    __version__ = "1.7.1"
     __author__ = "Akai"
 
     def __init__(self, bot):
@@ -41,12 +45,107 @@ class Reach(commands.Cog):
             "arrow": "➡️",
         }
         self.config.register_global(**default_global)
+        # Guild ID -> role bitset index, built the first time reach runs in the guild.
+        self.indexes: Dict[int, RoleIndex] = {}
+        self.cache = ReachCache()
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         """Thanks Sinbad!"""
         pre_processed = super().format_help_for_context(ctx)
         return f"{pre_processed}\n\nAuthor: {self.__author__}\nCog Version: {self.__version__}"
 
+    def get_index(self, guild: discord.Guild) -> RoleIndex:
+        index = self.indexes.get(guild.id)
+        if index is None:
+            index = self.indexes[guild.id] = RoleIndex(guild)
+        return index
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        index = self.indexes.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+        self.cache.invalidate_guild(member.guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member) -> None:
+        index = self.indexes.get(member.guild.id)
+        if index is not None:
+            index.remove(member)
+        self.cache.invalidate_guild(member.guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_update(
+        self, before: discord.Member, after: discord.Member
+    ) -> None:
+        index = self.indexes.get(after.guild.id)
+        if index is not None:
+            index.update(before, after)
+        if before._roles != after._roles:
+            self.cache.invalidate_guild(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_presence_update(
+        self, before: discord.Member, after: discord.Member
+    ) -> None:
+        index = self.indexes.get(after.guild.id)
+        if index is not None:
+            index.update_presence(after)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.indexes.pop(guild.id, None)
+        self.cache.invalidate_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_update(
+        self, before: discord.Guild, after: discord.Guild
+    ) -> None:
+        if before.owner_id != after.owner_id:
+            self.cache.invalidate_guild(after.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(
+        self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
+    ) -> None:
+        self.cache.invalidate_channel(after.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        self.cache.invalidate_channel(channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(
+        self, before: discord.Role, after: discord.Role
+    ) -> None:
+        if before.permissions != after.permissions:
+            self.cache.invalidate_guild(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        self.cache.invalidate_guild(role.guild.id)
+
+    async def parse_targets(
+        self, ctx: commands.Context, roles: List[Union[discord.Role, str]]
+    ) -> Optional[List[Target]]:
+        if len(roles) == 0:
+            await ctx.send("Please enter atleast one role to check reach of.")
+            return None
+
+        targets: List[Target] = []
+        for role in roles:
+            if isinstance(role, discord.Role):
+                targets.append(role)
+            elif "everyone" in role.lower():
+                targets.append("everyone")
+            elif "here" in role.lower():
+                targets.append("here")
+            else:
+                await ctx.send("Invalid role passed.")
+                return None
+
+        return targets
+
     @commands.hybrid_group(invoke_without_command=True)
     @commands.guild_only()
     async def reach(
@@ -58,42 +157,31 @@ class Reach(commands.Cog):
         """Shows the reach of roles in a channel"""
         assert ctx.guild is not None
 
-        if len(roles) == 0:
-            await ctx.send("Please enter atleast one role to check reach of.")
+        targets = await self.parse_targets(ctx, list(roles))
+        if targets is None:
             return
 
         arrow = await self.config.arrow()
-        members = set()
-        total_members = set()
+        # The index is brought up to date and reach worked out in a worker thread,
+        # so large guilds do not hold up the event loop.
+        async with ctx.typing():
+            reports = await run_reach(
+                self.get_index(ctx.guild), [channel], targets, cache=self.cache
+            )
+        report = reports[0]
+
         description = f"Channel: {channel.mention} `{channel.id}`\n\n"
-        for role in roles:
-            if isinstance(role, str):
-                if "everyone" in role.lower():
-                    for member in ctx.guild.default_role.members:
-                        total_members.add(member)
-                        if channel.permissions_for(member).read_messages:
-                            members.add(member)
-                    description += f"\n{arrow} @everyone members: {len(ctx.guild.default_role.members)} reach: {100 * len(members) / len(ctx.guild.default_role.members):.2f}%"
-                elif "here" in role.lower():
-                    for member in ctx.guild.members:
-                        if member.status != discord.Status.offline:
-                            total_members.add(member)
-                            if channel.permissions_for(member).read_messages:
-                                members.add(member)
-                    description += f"\n{arrow} @here members: {len(total_members)} reach: {100 * len(members) / len(total_members):.2f}%"
-
-                else:
-                    await ctx.send("Invalid role passed.")
-                    return
+        for line in report.lines:
+            if isinstance(line.target, discord.Role):
+                name = f"{line.target.mention} `{line.target.id}`"
             else:
-                for member in role.members:
-                    total_members.add(member)
-                    if channel.permissions_for(member).read_messages:
-                        members.add(member)
-                description += f"\n{arrow} {role.mention} `{role.id}` members: {len(role.members)} reach: {100 * len(role.members) / len(total_members):.2f}%"
+                name = f"@{line.target}"
+            description += (
+                f"\n{arrow} {name} members: {line.members} reach: {line.percent:.2f}%"
+            )
 
-        percent = 100 * len(members) / len(total_members)
-        description += f"\nTotal reach: {len(members)} out of {len(total_members)} targeted members\nwhich represents {percent:.2f}%"
+        percent = 100 * report.reached / report.targeted if report.targeted else 0
+        description += f"\nTotal reach: {report.reached} out of {report.targeted} targeted members\nwhich represents {percent:.2f}%"
 
         embed = discord.Embed(
             title="**Roles Reach**", description=description, color=0x2B2D31
@@ -102,6 +190,98 @@ class Reach(commands.Cog):
 
         await ctx.send(embed=embed)
 
+    @reach.command(name="multi", with_app_command=False)
+    @commands.guild_only()
+    async def reach_multi(
+        self,
+        ctx: commands.Context,
+        channels: commands.Greedy[Union[discord.TextChannel, discord.CategoryChannel]],
+        *roles: Union[discord.Role, str],
+    ):
+        """Shows the reach of roles in many channels or the channels of a category"""
+        assert ctx.guild is not None
+
+        text_channels: List[discord.TextChannel] = []
+        for channel in channels:
+            if isinstance(channel, discord.CategoryChannel):
+                text_channels.extend(channel.text_channels)
+            else:
+                text_channels.append(channel)
+        text_channels = list(dict.fromkeys(text_channels))
+
+        if len(text_channels) == 0:
+            await ctx.send("Please enter atleast one channel or category.")
+            return
+
+        targets = await self.parse_targets(ctx, list(roles))
+        if targets is None:
+            return
+
+        # The targets are resolved once for every channel.
+        async with ctx.typing():
+            reports = await run_reach(
+                self.get_index(ctx.guild), text_channels, targets, cache=self.cache
+            )
+
+        names = []
+        for target in targets:
+            if isinstance(target, discord.Role):
+                names.append(target.mention)
+            else:
+                names.append(f"@{target}")
+        header = f"Roles: {', '.join(names)}\nTargeted members: {reports[0].targeted}\n"
+
+        width = min(max(len(channel.name) for channel in text_channels) + 1, 32)
+        table = f"{'Channel':<{width}} {'Reached':>9} {'Reach':>8}\n"
+        for channel, report in zip(text_channels, reports):
+            percent = 100 * report.reached / report.targeted if report.targeted else 0
+            name = f"#{channel.name}"[:width]
+            table += f"{name:<{width}} {report.reached:>9} {percent:>7.2f}%\n"
+
+        for page_number, page in enumerate(pagify(table, page_length=3900)):
+            embed = discord.Embed(
+                title="**Roles Reach**",
+                description=(header if page_number == 0 else "") + box(page),
+                color=0x2B2D31,
+            )
+            embed.set_footer(text="Run ';invite' to invite me!")
+            await ctx.send(embed=embed)
+
+    @reach.command()
+    @commands.guild_only()
+    @commands.admin_or_permissions(manage_guild=True)
+    async def stats(self, ctx: commands.Context):
+        """Shows what keeping the reach index of this server up to date costs"""
+        assert ctx.guild is not None
+
+        index = self.indexes.get(ctx.guild.id)
+        if index is None:
+            await ctx.send("Reach has not been used in this server yet.")
+            return
+
+        presence_average = (
+            1_000_000 * index.presence_seconds / index.presence_updates
+            if index.presence_updates
+            else 0
+        )
+        description = (
+            f"Members indexed: {len(index.slots)}\n"
+            f"Roles indexed: {len(index.roles)}\n"
+            f"Online members: {len(index.online)}\n"
+            f"Index memory: {index.memory() / 1024:.1f} KiB\n"
+            f"Rebuilds: {index.rebuilds}, "
+            f"last took {index.rebuild_seconds * 1000:.1f}ms\n"
+            f"Presence updates: {index.presence_updates}, "
+            f"{index.presence_seconds * 1000:.1f}ms in total, "
+            f"{presence_average:.1f}µs each\n"
+            f"Cached reports: {len(self.cache)}"
+        )
+
+        embed = discord.Embed(
+            title="**Reach Index**", description=description, color=0x2B2D31
+        )
+        await ctx.send(embed=embed)
+
     @reach.command()
     @commands.is_owner()
     async def setarrow(self, ctx: commands.Context, emoji: discord.Emoji):
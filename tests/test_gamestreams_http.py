@@ -0,0 +1,231 @@
+"""Helix requests and the shared rate limiter against the local mock Helix server."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from gamestreams.exceptions import FetchError
+from gamestreams.http import RateLimiter, helix_get
+from gamestreams.listings import StreamListings
+from gamestreams.mock import CLIENT_ID, HEADERS, MockHelix
+from gamestreams.providers import TwitchProvider
+from gamestreams.views import StreamPager
+
+# Low enough that every test runs into the limit within a second or two.
+RATE_LIMIT = 5
+RATE_PERIOD = 1
+
+
+def run_against_mock(test, **mock_options) -> None:
+    async def runner() -> None:
+        # Limiters are shared per client ID across the process, every test starts
+        # with one that matches the mock server's bucket.
+        limiter = RateLimiter._limiters[CLIENT_ID] = RateLimiter(
+            limit=RATE_LIMIT, period=RATE_PERIOD
+        )
+        mock = MockHelix(
+            rate_limit=RATE_LIMIT, rate_period=RATE_PERIOD, seed=0, **mock_options
+        )
+        url = await mock.start()
+        try:
+            await test(mock, url, limiter)
+        finally:
+            await mock.close()
+            RateLimiter._limiters.clear()
+
+    asyncio.run(runner())
+
+
+def test_concurrent_requests_stay_under_the_limit():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        names = list(mock.games_by_name)
+        results = await asyncio.gather(
+            *(
+                helix_get("games", headers=HEADERS, params={"name": name}, url=url)
+                for name in names * 3
+            )
+        )
+
+        assert all(len(result["data"]) == 1 for result in results)
+        assert mock.requests["games"] == len(names) * 3
+        assert mock.requests["429"] == 0
+
+    run_against_mock(test, games=5, streams_per_game=0)
+
+
+def test_remaining_header_clamps_local_tokens():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        # Another process with the same client ID used most of the bucket.
+        mock._buckets[CLIENT_ID] = [3, time.time()]
+
+        await helix_get("games", headers=HEADERS, params={"name": "Game 0"}, url=url)
+
+        assert limiter.tokens < 3
+
+    run_against_mock(test, games=1, streams_per_game=0)
+
+
+def test_recovers_after_a_forced_429():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        # The local bucket is full but Twitch has nothing left.
+        mock._buckets[CLIENT_ID] = [0, time.time()]
+
+        result = await helix_get(
+            "games", headers=HEADERS, params={"name": "Game 0"}, url=url
+        )
+
+        assert result["data"][0]["name"] == "Game 0"
+        # The retry waited for the reset instead of hammering the server.
+        assert mock.requests["429"] == 1
+        assert limiter.blocked_until > 0
+
+    run_against_mock(test, games=1, streams_per_game=0)
+
+
+def test_unauthorized_raises():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        headers = {**HEADERS, "Authorization": "Bearer expired"}
+        with pytest.raises(FetchError, match="credentials"):
+            await helix_get(
+                "games", headers=headers, params={"name": "Game 0"}, url=url
+            )
+
+        assert mock.requests["401"] == 1
+
+    run_against_mock(test, games=1, streams_per_game=0)
+
+
+def test_games_are_looked_up_by_id():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        provider = TwitchProvider(None, url=url)  # type: ignore
+        game_ids = list(mock.games)
+        mock.rename_game(game_ids[0], "Renamed")
+
+        games = await provider.request_games_by_id(
+            [*game_ids, 1], headers=HEADERS  # Unknown IDs are left out.
+        )
+
+        assert [game["name"] for game in games] == ["Renamed", "Game 1"]
+        assert mock.requests["games"] == 1
+
+    run_against_mock(test, games=2, streams_per_game=0)
+
+
+class FakeAuth:
+    """Hands out headers like ``TwitchAuth`` does, starting with a revoked token."""
+
+    def __init__(self) -> None:
+        self.current = {**HEADERS, "Authorization": "Bearer revoked"}
+        self.invalidated = 0
+
+    async def headers(self) -> dict:
+        return self.current
+
+    def invalidate(self) -> None:
+        self.invalidated += 1
+        self.current = HEADERS
+
+
+def test_unauthorized_retries_with_renewed_headers():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        provider = TwitchProvider(None, url=url)  # type: ignore
+        auth = provider.auth = FakeAuth()  # type: ignore
+        stale_headers = await auth.headers()
+
+        games = await provider.request_games(["Game 0"], headers=stale_headers)
+        assert games[0]["name"] == "Game 0"
+        # Requests still holding the old headers reuse the renewed ones.
+        await provider.request_games(["Game 0"], headers=stale_headers)
+
+        assert auth.invalidated == 1
+        assert mock.requests["401"] == 2
+        assert mock.requests["games"] == 4  # Each 401 was retried once.
+
+    run_against_mock(test, games=1, streams_per_game=0)
+
+
+def test_unauthorized_without_new_headers_raises():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        headers = {**HEADERS, "Authorization": "Bearer expired"}
+
+        async def reauthorize(failed_headers: dict) -> dict:
+            return failed_headers
+
+        with pytest.raises(FetchError, match="credentials"):
+            await helix_get(
+                "games",
+                headers=headers,
+                params={"name": "Game 0"},
+                url=url,
+                reauthorize=reauthorize,
+            )
+
+        assert mock.requests["401"] == 1
+
+    run_against_mock(test, games=1, streams_per_game=0)
+
+
+def test_fetch_streams_pages_without_429s():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        provider = TwitchProvider(None, url=url)  # type: ignore
+        games = [
+            provider.make_game(data, headers=HEADERS) for data in mock.games.values()
+        ]
+        streams = await provider.fetch_streams(games, headers=HEADERS)
+
+        for game in games:
+            assert {stream.id for stream in streams[game]} == set(mock.streams[game.id])
+            viewer_counts = [stream.viewer_count for stream in streams[game]]
+            assert viewer_counts == sorted(viewer_counts, reverse=True)
+
+        # 600 streams over pages of 100 is more requests than the bucket holds.
+        assert mock.requests["streams"] > RATE_LIMIT
+        assert mock.requests["429"] == 0
+
+    run_against_mock(test, games=4, streams_per_game=150)
+
+
+def test_stream_pages_are_fetched_while_iterating():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        provider = TwitchProvider(None, url=url)  # type: ignore
+        game = provider.make_game(next(iter(mock.games.values())), headers=HEADERS)
+
+        async for page, cursor in provider.iter_stream_pages(
+            game, headers=HEADERS, page_size=10
+        ):
+            assert len(page) == 10 and cursor is not None
+            break
+        assert mock.requests["streams"] == 1
+
+        pages = [
+            page
+            async for page, _ in provider.iter_stream_pages(
+                game, headers=HEADERS, page_size=10
+            )
+        ]
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert mock.requests["streams"] == 4
+
+    run_against_mock(test, games=1, streams_per_game=25)
+
+
+def test_search_pages_hold_the_search_limit():
+    async def test(mock: MockHelix, url: str, limiter: RateLimiter) -> None:
+        provider = TwitchProvider(None, url=url)  # type: ignore
+        game = provider.make_game(next(iter(mock.games.values())), headers=HEADERS)
+        listings = StreamListings(provider)
+        pager = StreamPager(game, listings=listings, page_size=10)
+
+        await pager.load(10)
+        assert len(pager.streams) == 10
+        assert mock.requests["streams"] == 1
+
+        # Paging one past the loaded streams fetches one more page of the same size.
+        await pager.load(11)
+        assert len(pager.streams) == 20
+        assert mock.requests["streams"] == 2
+
+    run_against_mock(test, games=1, streams_per_game=50)
@@ -0,0 +1,84 @@
+"""Stream state deltas between polls."""
+
+from __future__ import annotations
+
+from typing import List
+
+from gamestreams.mock import HEADERS, MockHelix
+from gamestreams.providers import TwitchProvider
+from gamestreams.state import StreamStateStore
+from gamestreams.utils import Stream
+
+
+def make_streams(count: int) -> List[Stream]:
+    mock = MockHelix(games=1, streams_per_game=count, seed=0)
+    game_id, data = next(iter(mock.games.items()))
+    provider = TwitchProvider(None)  # type: ignore
+    game = provider.make_game(data, headers=HEADERS)
+    return [
+        provider.make_stream(game, stream) for stream in mock.streams[game_id].values()
+    ]
+
+
+def test_first_poll_starts_nothing():
+    store = StreamStateStore()
+    delta = store.apply(1, make_streams(3))
+
+    assert delta == ([], [], {})
+    # Nothing but the IDs is kept of streams that were already live.
+    assert list(store.games[1].values()) == [None, None, None]
+
+
+def test_started_updated_and_ended():
+    first, second, third = make_streams(3)
+    store = StreamStateStore()
+    store.apply(1, [first])
+    store.apply(1, [first, second, third])
+
+    previous_peak = second.viewer_count
+    second.viewer_count += 10
+    delta = store.apply(1, [first, second])
+
+    assert delta.started == []
+    assert delta.updated == [(second, previous_peak)]
+    assert delta.ended == {third.id: third.viewer_count}
+    assert store.get(1, second.id) == (second.viewer_count, second.viewer_count)
+
+    second.viewer_count -= 5
+    store.apply(1, [first, second])
+    assert store.get(1, second.id) == (second.viewer_count, second.viewer_count + 5)
+
+
+def test_streams_of_the_first_poll_are_not_updated():
+    first, second = make_streams(2)
+    store = StreamStateStore()
+    store.apply(1, [first])
+
+    first.viewer_count += 10
+    delta = store.apply(1, [first, second])
+
+    assert delta.started == [second]
+    assert delta.updated == []
+
+    delta = store.apply(1, [second])
+    assert delta.ended == {}
+
+
+def test_duplicate_streams_in_a_poll_are_counted_once():
+    first, second, third = make_streams(3)
+    store = StreamStateStore()
+    store.apply(1, [first])
+    store.apply(1, [first, second])
+
+    # The streams were returned on two pages.
+    second.viewer_count += 5
+    delta = store.apply(1, [first, second, first, second])
+
+    assert delta.started == []
+    assert len(delta.updated) == 1
+    assert delta.ended == {}
+
+    delta = store.apply(1, [first, second, third, third])
+
+    assert delta.started == [third]
+    assert delta.updated == []